@@ -1,14 +1,21 @@
 """API endpoints for lead management."""
 
+import base64
+import json
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, delete, update, func, and_, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
+from app.cache import cached, etag_matches, make_etag
+from app.config import settings
 from app.database import get_db
-from app.models import Lead, LeadStatus, WebsiteAnalysis
+from app.models import Lead, LeadStatus, Proposal, WebsiteAnalysis
+from app.models.lead import LEAD_SEARCH_DOCUMENT
 from app.schemas import (
     LeadCreate,
     LeadUpdate,
@@ -20,6 +27,42 @@ from app.services import LeadQualifierService, WebsiteAnalyzerService
 
 router = APIRouter(prefix="/leads", tags=["leads"])
 
+# Zero count for every status, copied per stats request
+EMPTY_STATUS_COUNTS = {status.value: 0 for status in LeadStatus}
+
+
+def encode_cursor(lead: Lead) -> str:
+    """Encode a lead's sort key as an opaque pagination cursor."""
+    key = [lead.qualification_score, lead.created_at.isoformat(), lead.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[float], datetime, int]:
+    """Decode a pagination cursor into (score, created_at, id)."""
+    try:
+        score, created_at, lead_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return score, datetime.fromisoformat(created_at), int(lead_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(score: Optional[float], created_at: datetime, lead_id: int):
+    """Filter for leads sorted after the cursor position.
+
+    Order is qualification_score DESC NULLS LAST, created_at DESC, id DESC.
+    """
+    same_score_after = or_(
+        Lead.created_at < created_at,
+        and_(Lead.created_at == created_at, Lead.id < lead_id),
+    )
+    if score is None:
+        return and_(Lead.qualification_score.is_(None), same_score_after)
+    return or_(
+        Lead.qualification_score < score,
+        Lead.qualification_score.is_(None),
+        and_(Lead.qualification_score == score, same_score_after),
+    )
+
 
 @router.get("", response_model=LeadListResponse)
 async def list_leads(
@@ -29,44 +72,66 @@ async def list_leads(
     min_score: Optional[float] = Query(None, ge=0, le=100),
     source_id: Optional[int] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """List leads with pagination and filtering."""
-    query = select(Lead).options(selectinload(Lead.website_analysis))
+    """List leads with pagination and filtering.
 
+    Pass `next_cursor` from a previous response as `cursor` to fetch the
+    following page without OFFSET; `page` is then ignored.
+    """
     # Apply filters
+    filters = []
     if status:
-        query = query.where(Lead.status == status)
+        filters.append(Lead.status == status)
     if min_score is not None:
-        query = query.where(Lead.qualification_score >= min_score)
+        filters.append(Lead.qualification_score >= min_score)
     if source_id:
-        query = query.where(Lead.source_id == source_id)
+        filters.append(Lead.source_id == source_id)
     if search:
         search_filter = f"%{search}%"
-        query = query.where(
-            Lead.name.ilike(search_filter) |
-            Lead.company_name.ilike(search_filter) |
-            Lead.original_request.ilike(search_filter)
-        )
+        if db.bind.dialect.name == "postgresql":
+            # Matches the expression of the ix_leads_search_trgm index
+            filters.append(LEAD_SEARCH_DOCUMENT.ilike(search_filter))
+        else:
+            filters.append(
+                Lead.name.ilike(search_filter) |
+                Lead.company_name.ilike(search_filter) |
+                Lead.original_request.ilike(search_filter)
+            )
 
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query)
+    total = await db.scalar(select(func.count(Lead.id)).where(*filters))
+
+    query = select(Lead).options(joinedload(Lead.website_analysis)).where(*filters)
 
     # Apply pagination
-    query = query.order_by(Lead.qualification_score.desc().nulls_last(), Lead.created_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
+    query = query.order_by(
+        Lead.qualification_score.desc().nulls_last(),
+        Lead.created_at.desc(),
+        Lead.id.desc(),
+    )
+    if cursor:
+        query = query.where(after_cursor(*decode_cursor(cursor)))
+    else:
+        query = query.offset((page - 1) * per_page)
+    query = query.limit(per_page)
 
     result = await db.execute(query)
     leads = result.scalars().all()
 
-    return LeadListResponse(
-        items=[LeadResponse.model_validate(lead) for lead in leads],
-        total=total or 0,
-        page=page,
-        per_page=per_page,
-        pages=(total or 0 + per_page - 1) // per_page,
-    )
+    lead_page = LeadListResponse.model_validate({
+        "items": leads,
+        "total": total or 0,
+        "page": page,
+        "per_page": per_page,
+        "pages": ((total or 0) + per_page - 1) // per_page,
+        "next_cursor": encode_cursor(leads[-1]) if len(leads) == per_page else None,
+    })
+
+    # Serialize in pydantic-core; returning a Response skips FastAPI's
+    # second validation and jsonable_encoder pass over the page
+    return Response(lead_page.model_dump_json(), media_type="application/json")
 
 
 @router.get("/hot", response_model=list[LeadResponse])
@@ -76,39 +141,35 @@ async def get_hot_leads(
 ):
     """Get top qualified (hot) leads."""
     qualifier = LeadQualifierService(db)
-    leads = await qualifier.get_hot_leads(limit)
-    return [LeadResponse.model_validate(lead) for lead in leads]
+    return await qualifier.get_hot_leads(limit)
 
 
 @router.get("/stats")
+@cached(expire=settings.stats_cache_seconds)
 async def get_leads_stats(db: AsyncSession = Depends(get_db)):
     """Get lead statistics."""
-    # Total leads
-    total = await db.scalar(select(func.count(Lead.id)))
-
-    # By status
-    status_counts = {}
-    for status in LeadStatus:
-        count = await db.scalar(
-            select(func.count(Lead.id)).where(Lead.status == status)
-        )
-        status_counts[status.value] = count or 0
-
-    # Average scores
-    avg_score = await db.scalar(
-        select(func.avg(Lead.qualification_score)).where(
-            Lead.qualification_score.isnot(None)
+    # Totals, average score and contact coverage in a single pass
+    has_contact = or_(
+        Lead.email.isnot(None),
+        Lead.phone.isnot(None),
+        Lead.telegram.isnot(None),
+    )
+    totals = await db.execute(
+        select(
+            func.count(Lead.id),
+            func.avg(Lead.qualification_score),
+            func.count(Lead.id).filter(has_contact),
         )
     )
+    total, avg_score, with_contact = totals.one()
 
-    # Leads with contact
-    with_contact = await db.scalar(
-        select(func.count(Lead.id)).where(
-            (Lead.email.isnot(None)) |
-            (Lead.phone.isnot(None)) |
-            (Lead.telegram.isnot(None))
-        )
+    # By status
+    status_counts = EMPTY_STATUS_COUNTS.copy()
+    by_status = await db.execute(
+        select(Lead.status, func.count(Lead.id)).group_by(Lead.status)
     )
+    for status, count in by_status:
+        status_counts[status.value] = count
 
     return {
         "total": total or 0,
@@ -122,12 +183,14 @@ async def get_leads_stats(db: AsyncSession = Depends(get_db)):
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """Get a single lead by ID."""
     result = await db.execute(
         select(Lead)
-        .options(selectinload(Lead.website_analysis))
+        .options(joinedload(Lead.website_analysis))
         .where(Lead.id == lead_id)
     )
     lead = result.scalar_one_or_none()
@@ -135,6 +198,12 @@ async def get_lead(
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
+    analysis = lead.website_analysis
+    etag = make_etag(lead.id, lead.updated_at, analysis.analyzed_at if analysis else None)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     return LeadResponse.model_validate(lead)
 
 
@@ -146,7 +215,11 @@ async def create_lead(
     """Create a new lead manually."""
     lead = Lead(**lead_data.model_dump())
     db.add(lead)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Lead with this source URL already exists")
     await db.refresh(lead)
     return LeadResponse.model_validate(lead)
 
@@ -158,18 +231,25 @@ async def update_lead(
     db: AsyncSession = Depends(get_db),
 ):
     """Update a lead."""
-    result = await db.execute(select(Lead).where(Lead.id == lead_id))
+    update_data = lead_data.model_dump(exclude_unset=True)
+    if update_data:
+        query = (
+            update(Lead)
+            .where(Lead.id == lead_id)
+            .values(**update_data)
+            .returning(Lead)
+            .execution_options(populate_existing=True)
+        )
+    else:
+        query = select(Lead).where(Lead.id == lead_id)
+
+    result = await db.execute(query.options(selectinload(Lead.website_analysis)))
     lead = result.scalar_one_or_none()
 
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    update_data = lead_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(lead, field, value)
-
     await db.commit()
-    await db.refresh(lead)
 
     return LeadResponse.model_validate(lead)
 
@@ -180,13 +260,15 @@ async def delete_lead(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a lead."""
-    result = await db.execute(select(Lead).where(Lead.id == lead_id))
-    lead = result.scalar_one_or_none()
+    # Delete dependent rows first, as the ORM delete used to; the foreign
+    # keys have no ON DELETE and SQLite does not enforce them
+    await db.execute(delete(WebsiteAnalysis).where(WebsiteAnalysis.lead_id == lead_id))
+    await db.execute(delete(Proposal).where(Proposal.lead_id == lead_id))
+    result = await db.execute(delete(Lead).where(Lead.id == lead_id))
 
-    if not lead:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    await db.delete(lead)
     await db.commit()
 
 
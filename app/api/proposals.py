@@ -2,10 +2,11 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import etag_matches, make_etag
 from app.database import get_db
 from app.models import Proposal, ProposalStatus, ProposalChannel
 from app.schemas import (
@@ -19,6 +20,10 @@ from app.services import ProposalGeneratorService
 
 router = APIRouter(prefix="/proposals", tags=["proposals"])
 
+# Enum listings never change at runtime, so build them once
+PROPOSAL_CHANNELS = [{"value": ch.value, "name": ch.name} for ch in ProposalChannel]
+PROPOSAL_STATUSES = [{"value": st.value, "name": st.name} for st in ProposalStatus]
+
 
 @router.get("", response_model=list[ProposalResponse])
 async def list_proposals(
@@ -40,14 +45,14 @@ async def list_proposals(
     query = query.order_by(Proposal.created_at.desc())
 
     result = await db.execute(query)
-    proposals = result.scalars().all()
-
-    return [ProposalResponse.model_validate(p) for p in proposals]
+    return result.scalars().all()
 
 
 @router.get("/{proposal_id}", response_model=ProposalResponse)
 async def get_proposal(
     proposal_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """Get a single proposal by ID."""
@@ -59,6 +64,21 @@ async def get_proposal(
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
 
+    # Proposals have no updated_at, so hash the fields that can change
+    etag = make_etag(
+        proposal.id,
+        proposal.version,
+        proposal.status,
+        proposal.subject,
+        proposal.content,
+        proposal.sent_at,
+        proposal.opened_at,
+        proposal.replied_at,
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     return ProposalResponse.model_validate(proposal)
 
 
@@ -114,20 +134,25 @@ async def update_proposal(
     db: AsyncSession = Depends(get_db),
 ):
     """Update a proposal."""
-    result = await db.execute(
-        select(Proposal).where(Proposal.id == proposal_id)
-    )
+    update_data = proposal_data.model_dump(exclude_unset=True)
+    if update_data:
+        query = (
+            update(Proposal)
+            .where(Proposal.id == proposal_id)
+            .values(**update_data)
+            .returning(Proposal)
+            .execution_options(populate_existing=True)
+        )
+    else:
+        query = select(Proposal).where(Proposal.id == proposal_id)
+
+    result = await db.execute(query)
     proposal = result.scalar_one_or_none()
 
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
 
-    update_data = proposal_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(proposal, field, value)
-
     await db.commit()
-    await db.refresh(proposal)
 
     return ProposalResponse.model_validate(proposal)
 
@@ -139,14 +164,12 @@ async def delete_proposal(
 ):
     """Delete a proposal."""
     result = await db.execute(
-        select(Proposal).where(Proposal.id == proposal_id)
+        delete(Proposal).where(Proposal.id == proposal_id)
     )
-    proposal = result.scalar_one_or_none()
 
-    if not proposal:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Proposal not found")
 
-    await db.delete(proposal)
     await db.commit()
 
 
@@ -169,16 +192,10 @@ async def mark_proposal_sent(
 @router.get("/channels/list")
 async def list_proposal_channels():
     """List available proposal channels."""
-    return [
-        {"value": ch.value, "name": ch.name}
-        for ch in ProposalChannel
-    ]
+    return PROPOSAL_CHANNELS
 
 
 @router.get("/statuses/list")
 async def list_proposal_statuses():
     """List available proposal statuses."""
-    return [
-        {"value": st.value, "name": st.name}
-        for st in ProposalStatus
-    ]
+    return PROPOSAL_STATUSES
@@ -1,16 +1,45 @@
 """API endpoints for lead search operations."""
 
+import asyncio
+import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.cache import cached
+from app.config import settings
+from app.database import get_db, async_session_maker
 from app.models import SourceType
 from app.services import LeadFinderService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/search", tags=["search"])
 
+SOURCE_TYPE_DESCRIPTIONS = {
+    SourceType.TELEGRAM_CHANNEL: "Telegram каналы и чаты",
+    SourceType.TELEGRAM_CHAT: "Telegram чаты",
+    SourceType.FORUM: "Форумы и сообщества",
+    SourceType.FREELANCE_PLATFORM: "Фриланс-биржи (FL.ru, Kwork и др.)",
+    SourceType.SOCIAL_MEDIA: "Социальные сети",
+    SourceType.JOB_BOARD: "Доски объявлений о работе",
+    SourceType.CLASSIFIED_ADS: "Доски объявлений (Avito и др.)",
+    SourceType.DIRECTORY: "Бизнес-каталоги",
+    SourceType.MANUAL: "Ручной ввод",
+    SourceType.OTHER: "Другие источники",
+}
+
+# Enum listing never changes at runtime, so build it once
+SOURCE_TYPES = [
+    {
+        "value": st.value,
+        "name": st.name,
+        "description": SOURCE_TYPE_DESCRIPTIONS.get(st, st.name),
+    }
+    for st in SourceType
+]
+
 
 @router.post("/run")
 async def run_search(
@@ -27,26 +56,39 @@ async def run_search(
     return results
 
 
+async def search_task(semaphore: asyncio.Semaphore, max_results_per_source: int):
+    """Run a full search with its own database session."""
+    async with semaphore:
+        async with async_session_maker() as db:
+            try:
+                finder = LeadFinderService(db)
+                await finder.search_all_sources(max_results_per_source=max_results_per_source)
+            except Exception as e:
+                await db.rollback()
+                logger.exception("Background search failed: %s", e)
+
+
 @router.post("/run-background")
 async def run_search_background(
-    background_tasks: BackgroundTasks,
+    request: Request,
     max_results_per_source: int = Query(50, ge=1, le=200),
-    db: AsyncSession = Depends(get_db),
 ):
     """Start a search in the background."""
-    # Note: For production, you'd want to use Celery or similar
-    # This is a simplified background task
+    # Searches beyond max_concurrent_searches wait for a free slot
+    tasks: set = request.app.state.search_tasks
+    status = "queued" if len(tasks) >= settings.max_concurrent_searches else "running"
 
-    async def search_task():
-        finder = LeadFinderService(db)
-        await finder.search_all_sources(max_results_per_source=max_results_per_source)
-
-    background_tasks.add_task(search_task)
+    task = asyncio.create_task(
+        search_task(request.app.state.search_semaphore, max_results_per_source)
+    )
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
 
-    return {"message": "Search started in background", "status": "running"}
+    return {"message": "Search started in background", "status": status}
 
 
 @router.get("/stats")
+@cached(expire=settings.stats_cache_seconds)
 async def get_search_stats(db: AsyncSession = Depends(get_db)):
     """Get search statistics."""
     finder = LeadFinderService(db)
@@ -97,25 +139,7 @@ async def run_custom_search(
 @router.get("/source-types")
 async def list_source_types():
     """List available source types for searching."""
-    return [
-        {
-            "value": st.value,
-            "name": st.name,
-            "description": {
-                SourceType.TELEGRAM_CHANNEL: "Telegram каналы и чаты",
-                SourceType.TELEGRAM_CHAT: "Telegram чаты",
-                SourceType.FORUM: "Форумы и сообщества",
-                SourceType.FREELANCE_PLATFORM: "Фриланс-биржи (FL.ru, Kwork и др.)",
-                SourceType.SOCIAL_MEDIA: "Социальные сети",
-                SourceType.JOB_BOARD: "Доски объявлений о работе",
-                SourceType.CLASSIFIED_ADS: "Доски объявлений (Avito и др.)",
-                SourceType.DIRECTORY: "Бизнес-каталоги",
-                SourceType.MANUAL: "Ручной ввод",
-                SourceType.OTHER: "Другие источники",
-            }.get(st, st.name),
-        }
-        for st in SourceType
-    ]
+    return SOURCE_TYPES
 
 
 @router.get("/keywords/default")
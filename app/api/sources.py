@@ -2,16 +2,20 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, delete, update, not_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import etag_matches, make_etag
 from app.database import get_db
-from app.models import Source, SourceType
+from app.models import Lead, Source, SourceType
 from app.schemas import SourceCreate, SourceUpdate, SourceResponse
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
+# Enum listing never changes at runtime, so build it once
+SOURCE_TYPES = [{"value": st.value, "name": st.name} for st in SourceType]
+
 
 @router.get("", response_model=list[SourceResponse])
 async def list_sources(
@@ -30,14 +34,14 @@ async def list_sources(
     query = query.order_by(Source.total_leads_found.desc())
 
     result = await db.execute(query)
-    sources = result.scalars().all()
-
-    return [SourceResponse.model_validate(source) for source in sources]
+    return result.scalars().all()
 
 
 @router.get("/{source_id}", response_model=SourceResponse)
 async def get_source(
     source_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """Get a single source by ID."""
@@ -47,6 +51,11 @@ async def get_source(
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
 
+    etag = make_etag(source.id, source.updated_at)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     return SourceResponse.model_validate(source)
 
 
@@ -70,18 +79,25 @@ async def update_source(
     db: AsyncSession = Depends(get_db),
 ):
     """Update a source."""
-    result = await db.execute(select(Source).where(Source.id == source_id))
+    update_data = source_data.model_dump(exclude_unset=True)
+    if update_data:
+        query = (
+            update(Source)
+            .where(Source.id == source_id)
+            .values(**update_data)
+            .returning(Source)
+            .execution_options(populate_existing=True)
+        )
+    else:
+        query = select(Source).where(Source.id == source_id)
+
+    result = await db.execute(query)
     source = result.scalar_one_or_none()
 
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
 
-    update_data = source_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(source, field, value)
-
     await db.commit()
-    await db.refresh(source)
 
     return SourceResponse.model_validate(source)
 
@@ -92,13 +108,15 @@ async def delete_source(
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a source."""
-    result = await db.execute(select(Source).where(Source.id == source_id))
-    source = result.scalar_one_or_none()
+    # Detach leads from the source first, as the ORM delete used to
+    await db.execute(
+        update(Lead).where(Lead.source_id == source_id).values(source_id=None)
+    )
+    result = await db.execute(delete(Source).where(Source.id == source_id))
 
-    if not source:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Source not found")
 
-    await db.delete(source)
     await db.commit()
 
 
@@ -108,15 +126,19 @@ async def toggle_source(
     db: AsyncSession = Depends(get_db),
 ):
     """Toggle source active status."""
-    result = await db.execute(select(Source).where(Source.id == source_id))
+    result = await db.execute(
+        update(Source)
+        .where(Source.id == source_id)
+        .values(is_active=not_(Source.is_active))
+        .returning(Source)
+        .execution_options(populate_existing=True)
+    )
     source = result.scalar_one_or_none()
 
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
 
-    source.is_active = not source.is_active
     await db.commit()
-    await db.refresh(source)
 
     return SourceResponse.model_validate(source)
 
@@ -124,7 +146,4 @@ async def toggle_source(
 @router.get("/types/list")
 async def list_source_types():
     """List available source types."""
-    return [
-        {"value": st.value, "name": st.name}
-        for st in SourceType
-    ]
+    return SOURCE_TYPES
@@ -0,0 +1,114 @@
+"""Response caching for read-mostly API endpoints."""
+
+import functools
+import hashlib
+import logging
+import time
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """TTL cache backed by Redis when configured, process memory otherwise."""
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "lead_gen"):
+        """Initialize the cache backend."""
+        self.prefix = prefix
+        self._redis = None
+        self._local: dict[str, tuple[float, Any]] = {}
+
+        if redis_url:
+            from redis import asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired."""
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(f"{self.prefix}:{key}")
+            except Exception as e:
+                logger.warning("Cache read failed for %s: %s", key, e)
+                return None
+            return orjson.loads(raw) if raw is not None else None
+
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, expire: int):
+        """Store a value for `expire` seconds."""
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    f"{self.prefix}:{key}",
+                    orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS),
+                    ex=expire,
+                )
+            except Exception as e:
+                logger.warning("Cache write failed for %s: %s", key, e)
+            return
+
+        self._local[key] = (time.monotonic() + expire, value)
+
+    async def clear(self):
+        """Drop all locally cached values."""
+        self._local.clear()
+
+    async def close(self):
+        """Close the Redis connection if one is open."""
+        if self._redis is not None:
+            await self._redis.close()
+
+
+response_cache = ResponseCache(settings.redis_url)
+
+
+def cached(expire: int) -> Callable:
+    """Cache an endpoint's JSON result, keyed by its query arguments."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key_parts = [func.__module__, func.__name__]
+            key_parts += [
+                f"{name}={value}"
+                for name, value in sorted(kwargs.items())
+                if not isinstance(value, AsyncSession)
+            ]
+            key = ":".join(key_parts)
+
+            value = await response_cache.get(key)
+            if value is None:
+                value = await func(*args, **kwargs)
+                await response_cache.set(key, value, expire)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from values that change whenever the resource does."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches the ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip() for value in header.split(",")}
+    return etag in candidates or "*" in candidates
@@ -17,19 +17,30 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./lead_gen.db"
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
 
     # OpenAI
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4-turbo-preview"
+    ai_cache_size: int = 1024
+    ai_cache_seconds: int = 604800
+    ai_requests_per_minute: int = 60
 
     # Application
     app_name: str = "Lead Generation System"
     debug: bool = True
+    workers: int = 1
     secret_key: str = "change-me-in-production"
+    cors_origins: list[str] = ["*"]
 
     # Search Settings
     search_interval_minutes: int = 60
     max_leads_per_search: int = 50
+    max_concurrent_searches: int = 2
+    analyze_concurrency: int = 10
 
     # Telegram (optional)
     telegram_api_id: Optional[str] = None
@@ -46,6 +57,9 @@ class Settings(BaseSettings):
     # Redis (optional)
     redis_url: Optional[str] = None
 
+    # Response caching
+    stats_cache_seconds: int = 30
+
 
 @lru_cache
 def get_settings() -> Settings:
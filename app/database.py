@@ -1,5 +1,6 @@
 """Database connection and session management."""
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -11,11 +12,31 @@ class Base(DeclarativeBase):
     pass
 
 
+# Connection pool options; SQLite has no server connections to pool
+engine_options = {}
+if not settings.database_url.startswith("sqlite"):
+    engine_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def json_serializer(value) -> str:
+    """Serialize JSON column values with orjson."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads,
+    **engine_options,
 )
 
 # Session factory
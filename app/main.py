@@ -1,26 +1,75 @@
 """Main FastAPI application."""
 
+import asyncio
+import logging
+import queue
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
+from app.cache import response_cache
 from app.config import settings
 from app.database import init_db, close_db
+from app.parsers.base import close_http_client
+from app.services.ai_client import close_openai_client
+from app.services.website_analyzer import close_http_session
 from app.api import leads_router, sources_router, proposals_router, search_router
 
 
+def start_logging() -> QueueListener:
+    """Route app log records through a queue written out by a background thread."""
+    # Handlers write to stderr synchronously, which would block the event loop
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    listener = QueueListener(log_queue, stream_handler)
+
+    app_logger = logging.getLogger("app")
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    app_logger.propagate = False
+
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: QueueListener):
+    """Flush queued log records and detach the queue handler."""
+    listener.stop()
+    app_logger = logging.getLogger("app")
+    for handler in list(app_logger.handlers):
+        if isinstance(handler, QueueHandler):
+            app_logger.removeHandler(handler)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
+    log_listener = start_logging()
     await init_db()
+    app.state.search_semaphore = asyncio.Semaphore(settings.max_concurrent_searches)
+    app.state.search_tasks = set()
     yield
     # Shutdown
+    for task in app.state.search_tasks:
+        task.cancel()
+    # Let cancelled searches unwind before the clients they use are closed
+    await asyncio.gather(*app.state.search_tasks, return_exceptions=True)
+    await response_cache.close()
+    await close_http_client()
+    await close_openai_client()
+    await close_http_session()
     await close_db()
+    stop_logging(log_listener)
 
 
 # Create FastAPI application
@@ -29,13 +78,15 @@ app = FastAPI(
     description="Automated lead generation system for web development services",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS middleware
+# CORS middleware; credentials are only allowed for an explicit origin list,
+# so a public API can send a static wildcard header
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=settings.cors_origins,
+    allow_credentials="*" not in settings.cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -45,6 +96,11 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Templates
 templates = Jinja2Templates(directory="app/templates")
+# Only stat template files for changes while developing
+templates.env.auto_reload = settings.debug
+
+# index.html has no per-request context, so it is rendered once per process
+index_html: Optional[bytes] = None
 
 # Include API routers
 app.include_router(leads_router, prefix="/api")
@@ -56,7 +112,10 @@ app.include_router(search_router, prefix="/api")
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Serve the main dashboard."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    global index_html
+    if index_html is None:
+        index_html = templates.TemplateResponse("index.html", {"request": request}).body
+    return HTMLResponse(content=index_html, headers={"Cache-Control": "public, max-age=60"})
 
 
 @app.get("/health")
@@ -84,9 +143,13 @@ async def api_info():
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop and httptools ship with uvicorn[standard]
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.workers,
+        reload=settings.debug and settings.workers == 1,
     )
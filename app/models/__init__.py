@@ -2,7 +2,7 @@
 
 from app.models.lead import Lead, LeadStatus
 from app.models.source import Source, SourceType
-from app.models.proposal import Proposal, ProposalStatus
+from app.models.proposal import Proposal, ProposalStatus, ProposalChannel
 from app.models.website_analysis import WebsiteAnalysis
 
 __all__ = [
@@ -12,5 +12,6 @@ __all__ = [
     "SourceType",
     "Proposal",
     "ProposalStatus",
+    "ProposalChannel",
     "WebsiteAnalysis",
 ]
@@ -4,7 +4,10 @@ import enum
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, Integer, Float, DateTime, Enum, ForeignKey, JSON
+from sqlalchemy import (
+    DDL, String, Text, Integer, Float, DateTime, Enum, ForeignKey, Index, JSON,
+    and_, event, func, literal,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -54,7 +57,7 @@ class Lead(Base):
     urgency: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # low, medium, high, urgent
 
     # Source Information
-    source_id: Mapped[Optional[int]] = mapped_column(ForeignKey("sources.id"), nullable=True)
+    source_id: Mapped[Optional[int]] = mapped_column(ForeignKey("sources.id"), nullable=True, index=True)
     source_url: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
     found_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -65,8 +68,10 @@ class Lead(Base):
     fit_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Status & Pipeline
+    # Stored as VARCHAR + CHECK rather than a native enum type, so adding a
+    # status does not need ALTER TYPE
     status: Mapped[LeadStatus] = mapped_column(
-        Enum(LeadStatus),
+        Enum(LeadStatus, native_enum=False, create_constraint=True, length=20),
         default=LeadStatus.NEW,
         nullable=False
     )
@@ -84,13 +89,15 @@ class Lead(Base):
         onupdate=datetime.utcnow
     )
 
-    # Relationships
-    source: Mapped[Optional["Source"]] = relationship("Source", back_populates="leads")
-    proposals: Mapped[list["Proposal"]] = relationship("Proposal", back_populates="lead")
+    # Relationships; the analysis is part of every lead response, the
+    # collections must be loaded explicitly instead of lazily per lead
+    source: Mapped[Optional["Source"]] = relationship("Source", back_populates="leads", lazy="raise")
+    proposals: Mapped[list["Proposal"]] = relationship("Proposal", back_populates="lead", lazy="raise")
     website_analysis: Mapped[Optional["WebsiteAnalysis"]] = relationship(
         "WebsiteAnalysis",
         back_populates="lead",
-        uselist=False
+        uselist=False,
+        lazy="joined",
     )
 
     def __repr__(self) -> str:
@@ -111,6 +118,63 @@ class Lead(Base):
         return any([self.email, self.phone, self.telegram])
 
 
+# Text matched by the lead list search filter. Literals are inlined so the
+# query expression matches the index expression below.
+_EMPTY = literal("", literal_execute=True)
+_SPACE = literal(" ", literal_execute=True)
+LEAD_SEARCH_DOCUMENT = (
+    func.coalesce(Lead.name, _EMPTY) + _SPACE
+    + func.coalesce(Lead.company_name, _EMPTY) + _SPACE
+    + func.coalesce(Lead.original_request, _EMPTY)
+)
+
+# Keyset pagination order of the lead list (PostgreSQL only: SQLite index
+# columns cannot declare NULLS LAST)
+Index(
+    "ix_leads_keyset",
+    Lead.qualification_score.desc().nulls_last(),
+    Lead.created_at.desc(),
+    Lead.id.desc(),
+).ddl_if(dialect="postgresql")
+
+# Trigram index so unanchored ILIKE search can use an index (PostgreSQL only)
+Index(
+    "ix_leads_search_trgm",
+    LEAD_SEARCH_DOCUMENT.label("search_document"),
+    postgresql_using="gin",
+    postgresql_ops={"search_document": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+# One lead per scraped post; bulk inserts skip conflicting rows
+Index("ux_leads_source_url", Lead.source_id, Lead.source_url, unique=True)
+
+# Duplicate checks for parsed leads look up stored contacts
+Index("ix_leads_email", Lead.email)
+Index("ix_leads_telegram", Lead.telegram)
+
+# Status filters (list, qualify-all, stats) ordered by priority
+Index("ix_leads_status_priority", Lead.status, Lead.priority.desc())
+
+# Qualified leads shown as hot; the partial index only holds matching rows
+HOT_LEADS_FILTER = and_(
+    Lead.status == LeadStatus.QUALIFIED,
+    Lead.qualification_score >= 60,
+)
+Index(
+    "ix_leads_hot",
+    Lead.qualification_score.desc(),
+    Lead.priority.desc(),
+    postgresql_where=HOT_LEADS_FILTER,
+    sqlite_where=HOT_LEADS_FILTER,
+)
+
+event.listen(
+    Lead.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 # Import at end to avoid circular imports
 from app.models.source import Source
 from app.models.proposal import Proposal
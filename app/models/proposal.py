@@ -59,9 +59,9 @@ class Proposal(Base):
     suggested_solutions: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
     portfolio_examples: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
 
-    # Status
+    # Status (VARCHAR + CHECK like Lead.status)
     status: Mapped[ProposalStatus] = mapped_column(
-        Enum(ProposalStatus),
+        Enum(ProposalStatus, native_enum=False, create_constraint=True, length=20),
         default=ProposalStatus.DRAFT,
         nullable=False
     )
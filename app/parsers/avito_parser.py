@@ -1,10 +1,10 @@
 """Parser for Avito classifieds (services section)."""
 
-import re
+from contextlib import aclosing
 from typing import AsyncGenerator, Optional
 from urllib.parse import urlencode, quote
 
-from app.parsers.base import BaseParser, ParsedLead
+from app.parsers.base import BaseParser, ParsedLead, build_automaton, matches_any
 
 
 class AvitoParser(BaseParser):
@@ -12,6 +12,9 @@ class AvitoParser(BaseParser):
 
     BASE_URL = "https://www.avito.ru"
 
+    # Words that mark a "looking for" post rather than an offer
+    LOOKING_MARKERS = build_automaton(["ищу", "нужен", "требуется", "закажу", "куплю"])
+
     # Search queries for website-related services
     DEFAULT_QUERIES = [
         "создание сайта",
@@ -50,69 +53,71 @@ class AvitoParser(BaseParser):
     async def parse_search_results(self, query: str, page: int = 1) -> list[dict]:
         """Parse Avito search results page."""
         url = self.build_search_url(query, page)
-        html = await self.fetch_page(url)
+        html = await self.fetch_page_bytes(url)
 
         if not html:
             return []
 
-        soup = self.parse_html(html)
+        tree = self.parse_tree(html)
         results = []
 
         # Find listing items
-        items = soup.find_all("div", {"data-marker": "item"})
+        items = tree.css('div[data-marker="item"]')
 
         for item in items:
-            try:
-                # Get title
-                title_tag = item.find("a", {"data-marker": "item-title"})
-                if not title_tag:
-                    continue
-
-                title = title_tag.get("title", "") or title_tag.get_text(strip=True)
-                item_url = self.BASE_URL + title_tag.get("href", "")
-
-                # Get price
-                price_tag = item.find("meta", {"itemprop": "price"})
-                price = price_tag.get("content") if price_tag else None
-
-                # Get description preview
-                desc_tag = item.find("div", {"class": re.compile(r"item-description")})
-                description = desc_tag.get_text(strip=True) if desc_tag else ""
-
-                # Get location
-                location_tag = item.find("div", {"class": re.compile(r"geo-address")})
-                location = location_tag.get_text(strip=True) if location_tag else ""
-
-                # Get seller info
-                seller_tag = item.find("div", {"data-marker": "item-line"})
-                seller = seller_tag.get_text(strip=True) if seller_tag else ""
-
-                # Check if this is a "looking for" post (not selling)
-                full_text = f"{title} {description}".lower()
-                is_looking = any(word in full_text for word in [
-                    "ищу", "нужен", "требуется", "закажу", "куплю"
-                ])
-
-                if is_looking and self.contains_keyword(full_text):
-                    results.append({
-                        "title": title,
-                        "url": item_url,
-                        "price": price,
-                        "description": description,
-                        "location": location,
-                        "seller": seller,
-                        "query": query,
-                    })
-
-            except Exception as e:
-                print(f"Error parsing Avito item: {e}")
+            # Get title
+            title_tag = item.css_first('a[data-marker="item-title"]')
+            if not title_tag:
+                continue
+
+            # Listings repeat across queries and pages; the query string
+            # only carries search context
+            href = (title_tag.attributes.get("href") or "").split("?", 1)[0]
+            item_url = self.BASE_URL + href
+            if not self.is_new_url(item_url):
                 continue
 
+            title = title_tag.attributes.get("title") or self.node_text(title_tag)
+
+            # Get price
+            price_tag = item.css_first('meta[itemprop="price"]')
+            price = price_tag.attributes.get("content") if price_tag else None
+
+            # Get description preview
+            desc_tag = item.css_first('div[class*="item-description"]')
+            description = self.node_text(desc_tag) if desc_tag else ""
+
+            # Get location
+            location_tag = item.css_first('div[class*="geo-address"]')
+            location = self.node_text(location_tag) if location_tag else ""
+
+            # Get seller info
+            seller_tag = item.css_first('div[data-marker="item-line"]')
+            seller = self.node_text(seller_tag) if seller_tag else ""
+
+            # Check if this is a "looking for" post (not selling)
+            text = f"{title} {description}"
+            text_lower = text.lower()
+            is_looking = matches_any(self.LOOKING_MARKERS, text_lower)
+
+            if is_looking and self.contains_keyword(text_lower, lowered=True):
+                results.append({
+                    "text": text,
+                    "text_lower": text_lower,
+                    "title": title,
+                    "url": item_url,
+                    "price": price,
+                    "description": description,
+                    "location": location,
+                    "seller": seller,
+                    "query": query,
+                })
+
         return results
 
     def create_lead_from_item(self, item: dict) -> ParsedLead:
         """Create a ParsedLead from an Avito item."""
-        text = f"{item['title']} {item['description']}"
+        text = item["text"]
         contacts = self.extract_contacts(text)
 
         # Try to extract name from seller info or text
@@ -129,7 +134,7 @@ class AvitoParser(BaseParser):
             business_description=item.get("description", ""),
             needs_description=item["title"],
             budget_mentioned=item.get("price"),
-            urgency=self.estimate_urgency(text),
+            urgency=self.estimate_urgency(item["text_lower"], lowered=True),
             raw_data=item,
         )
 
@@ -137,28 +142,18 @@ class AvitoParser(BaseParser):
         """Search for leads on Avito."""
         results_count = 0
 
-        for query in self.queries:
-            if results_count >= max_results:
-                break
-
-            try:
-                # Parse first 2 pages per query
-                for page in range(1, 3):
+        # Fetch the first 2 pages of every query concurrently
+        calls = [(query, page) for query in self.queries for page in range(1, 3)]
+        pages = self.iter_pages(self.parse_search_results, calls)
+        async with aclosing(pages):
+            async for items in pages:
+                for item in items:
                     if results_count >= max_results:
                         break
 
-                    items = await self.parse_search_results(query, page)
-
-                    for item in items:
-                        if results_count >= max_results:
-                            break
-
-                        lead = self.create_lead_from_item(item)
-                        yield lead
-                        results_count += 1
-
-            except Exception as e:
-                print(f"Error searching Avito for '{query}': {e}")
-                continue
+                    lead = self.create_lead_from_item(item)
+                    yield lead
+                    results_count += 1
 
-        await self.close()
+                if results_count >= max_results:
+                    break
@@ -1,17 +1,65 @@
 """Base parser class for all lead sources."""
 
-import re
+import asyncio
+import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, AsyncGenerator
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional, AsyncGenerator
 
-import aiohttp
-from bs4 import BeautifulSoup
+import ahocorasick
+import httpx
+import re2
 from fake_useragent import UserAgent
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# One HTTP client shared by all parsers, so connections and TLS sessions are reused
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client (HTTP/2, so concurrent requests share a connection)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0),
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client."""
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+
+
+@lru_cache
+def get_user_agent() -> UserAgent:
+    """Get the shared user agent database, loaded once per process."""
+    return UserAgent()
+
+
+def build_automaton(words: list[str]) -> ahocorasick.Automaton:
+    """Compile lowercased words into an Aho-Corasick automaton."""
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word.lower(), word)
+    automaton.make_automaton()
+    return automaton
+
+
+def matches_any(automaton: ahocorasick.Automaton, text: str) -> bool:
+    """Check whether any of the automaton's words occurs in text."""
+    return next(automaton.iter(text), None) is not None
+
+
+@dataclass(slots=True)
 class ParsedLead:
     """Data class for parsed lead information."""
     name: str
@@ -44,7 +92,7 @@ class BaseParser(ABC):
     """Abstract base class for all parsers."""
 
     # Keywords for finding website-related requests (Russian + English)
-    DEFAULT_KEYWORDS = [
+    DEFAULT_KEYWORDS = (
         # Russian keywords
         "нужен сайт",
         "создать сайт",
@@ -77,49 +125,126 @@ class BaseParser(ABC):
         "online store",
         "web design",
         "website redesign",
-    ]
+    )
+
+    # Patterns for extracting contact information (RE2 runs in linear time, no backtracking)
+    EMAIL_PATTERN = re2.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+    PHONE_PATTERN = re2.compile(r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,3}[)]?[-\s\.]?[0-9]{3,6}[-\s\.]?[0-9]{3,6}')
+    TELEGRAM_PATTERN = re2.compile(r'@([a-zA-Z][a-zA-Z0-9_]{4,31})|t\.me/([a-zA-Z][a-zA-Z0-9_]{4,31})')
+    WEBSITE_PATTERN = re2.compile(r'https?://[^\s<>"{}|\\^`\[\]]+|www\.[^\s<>"{}|\\^`\[\]]+')
+    # An amount after "бюджет", or any amount with a unit; matched against lowercased text
+    BUDGET_PATTERN = re2.compile(r'бюджет[:\s]*[0-9][0-9\s]*(?:тыс|к|k|руб|₽|usd|\$|euro|€)?|[0-9]+\s*(?:тыс|к|k|руб|₽|usd|\$|euro|€)')
+    # Contact and budget patterns in one alternation, so text is scanned once.
+    # Contacts must keep their case, so the budget group alone gets a scoped
+    # (?i:...), which RE2 resolves at compile time.
+    CONTACT_PATTERN = re2.compile("|".join(
+        f"(?P<{name}>{pattern})"
+        for name, pattern in [
+            ("email", EMAIL_PATTERN.pattern),
+            ("phone", PHONE_PATTERN.pattern),
+            ("telegram", TELEGRAM_PATTERN.pattern),
+            ("website", WEBSITE_PATTERN.pattern),
+            ("budget", f"(?i:{BUDGET_PATTERN.pattern})"),
+        ]
+    ))
+
+    # Limit on listing pages fetched at once
+    MAX_CONCURRENT_PAGES = 5
 
-    # Patterns for extracting contact information
-    EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-    PHONE_PATTERN = re.compile(r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,3}[)]?[-\s\.]?[0-9]{3,6}[-\s\.]?[0-9]{3,6}')
-    TELEGRAM_PATTERN = re.compile(r'@([a-zA-Z][a-zA-Z0-9_]{4,31})|t\.me/([a-zA-Z][a-zA-Z0-9_]{4,31})')
-    WEBSITE_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+|www\.[^\s<>"{}|\\^`\[\]]+')
-    BUDGET_PATTERN = re.compile(r'бюджет[:\s]*([0-9\s]+(?:тыс|к|руб|₽|usd|\$|euro|€)?)|([0-9]+\s*(?:тыс|к|руб|₽|usd|\$|euro|€))', re.IGNORECASE)
+    # Seconds before a slow listing page is dropped
+    PAGE_TIMEOUT = 10
+
+    # Responses worth retrying, and how long to wait at most between tries
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRIES = 3
+    MAX_RETRY_DELAY = 4.0
+
+    # Markers for estimating urgency
+    URGENT_MARKERS = build_automaton(["срочно", "asap", "urgent", "быстро", "сегодня", "завтра", "на этой неделе"])
+    HIGH_URGENCY_MARKERS = build_automaton(["скоро", "в ближайшее время", "на следующей неделе"])
 
     def __init__(self, keywords: Optional[list[str]] = None):
         """Initialize parser with optional custom keywords."""
         self.keywords = keywords or self.DEFAULT_KEYWORDS
-        self.ua = UserAgent()
-        self._session: Optional[aiohttp.ClientSession] = None
-
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                headers={"User-Agent": self.ua.random},
-                timeout=aiohttp.ClientTimeout(total=30)
-            )
-        return self._session
-
-    async def close(self):
-        """Close HTTP session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        self.keyword_automaton = build_automaton(self.keywords)
+        self.ua = get_user_agent()
+        self.headers = {"User-Agent": self.ua.random}
+        self.seen_urls: set[str] = set()
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Seconds to wait before retrying, honouring a numeric Retry-After header."""
+        retry_after = response.headers.get("retry-after", "")
+        delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+        return min(delay, self.MAX_RETRY_DELAY)
+
+    async def get(self, url: str) -> httpx.Response:
+        """GET a URL, backing off while the server is rate limiting or failing."""
+        client = get_http_client()
+        for attempt in range(self.MAX_RETRIES):
+            response = await client.get(url, headers=self.headers)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES - 1:
+                break
+            await asyncio.sleep(self.retry_delay(response, attempt))
+        return response
 
     async def fetch_page(self, url: str) -> Optional[str]:
         """Fetch page content."""
         try:
-            session = await self.get_session()
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.text()
+            response = await self.get(url)
+            if response.status_code == 200:
+                return response.text
         except Exception as e:
-            print(f"Error fetching {url}: {e}")
+            logger.warning("Error fetching %s: %s", url, e)
         return None
 
-    def parse_html(self, html: str) -> BeautifulSoup:
-        """Parse HTML content."""
-        return BeautifulSoup(html, 'lxml')
+    async def fetch_page_bytes(self, url: str) -> Optional[bytes]:
+        """Fetch raw page content, leaving decoding to the HTML parser."""
+        try:
+            response = await self.get(url)
+            if response.status_code == 200:
+                return response.content
+        except Exception as e:
+            logger.warning("Error fetching %s: %s", url, e)
+        return None
+
+    async def iter_pages(
+        self,
+        parse: Callable[..., Awaitable[list[dict]]],
+        calls: list[tuple[Any, ...]],
+    ) -> AsyncGenerator[list[dict], None]:
+        """Run parse(*args) for every call concurrently, yielding results in call order.
+
+        Each result is yielded as soon as it and those before it are ready, so
+        the caller works on early pages while later ones are still fetched.
+        Pages that time out or fail over HTTP come back empty; pages still
+        pending when the generator is closed are cancelled.
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_PAGES)
+
+        async def run(args: tuple[Any, ...]) -> list[dict]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(parse(*args), timeout=self.PAGE_TIMEOUT)
+                except (asyncio.TimeoutError, httpx.HTTPError) as e:
+                    logger.warning("Dropped %s page %s: %r", self.get_source_name(), args, e)
+                    return []
+
+        tasks = [asyncio.create_task(run(args)) for args in calls]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def parse_tree(self, html: str | bytes) -> LexborHTMLParser:
+        """Parse HTML content for CSS selector queries."""
+        return LexborHTMLParser(html)
+
+    def node_text(self, node: LexborNode) -> str:
+        """Get a node's text, with child text runs separated by single spaces."""
+        return " ".join(node.text(separator=" ").split())
 
     def extract_email(self, text: str) -> Optional[str]:
         """Extract first email from text."""
@@ -143,36 +268,59 @@ class BaseParser(ABC):
         match = self.WEBSITE_PATTERN.search(text)
         return match.group(0) if match else None
 
-    def extract_budget(self, text: str) -> Optional[str]:
-        """Extract budget mention from text."""
-        match = self.BUDGET_PATTERN.search(text)
-        return match.group(0) if match else None
+    def extract_budget(self, text: str, text_lower: Optional[str] = None) -> Optional[str]:
+        """Extract budget mention from text (pass text_lower if already computed)."""
+        if text_lower is None:
+            text_lower = text.lower()
+        match = self.BUDGET_PATTERN.search(text_lower)
+        if not match:
+            return None
+        # Return the mention as written unless lowercasing changed the length
+        if len(text_lower) == len(text):
+            return text[match.start():match.end()]
+        return match.group(0)
 
-    def contains_keyword(self, text: str) -> bool:
-        """Check if text contains any keyword."""
-        text_lower = text.lower()
-        return any(keyword.lower() in text_lower for keyword in self.keywords)
+    def is_new_url(self, url: str) -> bool:
+        """Check that an item URL was not seen before in this parser's run."""
+        key = url.split("#", 1)[0].rstrip("/")
+        if key in self.seen_urls:
+            return False
+        self.seen_urls.add(key)
+        return True
 
-    def estimate_urgency(self, text: str) -> str:
-        """Estimate urgency based on text content."""
-        text_lower = text.lower()
-        urgent_markers = ["срочно", "asap", "urgent", "быстро", "сегодня", "завтра", "на этой неделе"]
-        high_markers = ["скоро", "в ближайшее время", "на следующей неделе"]
+    def contains_keyword(self, text: str, lowered: bool = False) -> bool:
+        """Check if text contains any keyword (pass lowered=True for lowercase text)."""
+        text_lower = text if lowered else text.lower()
+        return matches_any(self.keyword_automaton, text_lower)
 
-        if any(marker in text_lower for marker in urgent_markers):
+    def estimate_urgency(self, text: str, lowered: bool = False) -> str:
+        """Estimate urgency based on text content (pass lowered=True for lowercase text)."""
+        text_lower = text if lowered else text.lower()
+
+        if matches_any(self.URGENT_MARKERS, text_lower):
             return "urgent"
-        if any(marker in text_lower for marker in high_markers):
+        if matches_any(self.HIGH_URGENCY_MARKERS, text_lower):
             return "high"
         return "medium"
 
     def extract_contacts(self, text: str) -> dict:
-        """Extract all contact information from text."""
-        return {
-            "email": self.extract_email(text),
-            "phone": self.extract_phone(text),
-            "telegram": self.extract_telegram(text),
-            "website": self.extract_website(text),
-        }
+        """Extract all contact information and the budget mention from text."""
+        contacts = {"email": None, "phone": None, "telegram": None, "website": None, "budget": None}
+
+        for match in self.CONTACT_PATTERN.finditer(text):
+            kind = match.lastgroup
+            value = match.group()
+
+            if contacts["telegram"] is None and kind in ("telegram", "website"):
+                # Usernames come from @mentions and t.me links (matched as websites)
+                contacts["telegram"] = self.extract_telegram(value)
+            if kind != "telegram" and contacts[kind] is None:
+                contacts[kind] = value
+
+            if all(contacts.values()):
+                break
+
+        return contacts
 
     @abstractmethod
     async def search(self, max_results: int = 50) -> AsyncGenerator[ParsedLead, None]:
@@ -183,6 +331,21 @@ class BaseParser(ABC):
         """
         pass
 
+    async def search_batches(
+        self,
+        max_results: int = 50,
+        batch_size: int = 1000,
+    ) -> AsyncGenerator[list[ParsedLead], None]:
+        """Search for leads, yielding them in lists of up to batch_size."""
+        batch = []
+        async for parsed_lead in self.search(max_results):
+            batch.append(parsed_lead)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     @abstractmethod
     def get_source_name(self) -> str:
         """Return the name of this source."""
@@ -1,10 +1,26 @@
 """Parser for forums and communities."""
 
+import logging
 import re
+from contextlib import aclosing
+from dataclasses import dataclass
 from typing import AsyncGenerator, Optional
+from urllib.parse import urljoin
 from datetime import datetime
 
-from app.parsers.base import BaseParser, ParsedLead
+from app.parsers.base import BaseParser, ParsedLead, build_automaton, matches_any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ForumConfig:
+    """Where a forum lists its threads and how to read them."""
+    name: str
+    listing_url: str
+    item_selector: str
+    title_selector: str
+    preview_selector: str
 
 
 class ForumParser(BaseParser):
@@ -12,24 +28,36 @@ class ForumParser(BaseParser):
 
     # Forum configurations
     FORUMS = {
-        "searchengines": {
-            "name": "SearchEngines.guru",
-            "base_url": "https://searchengines.guru",
-            "search_path": "/forumdisplay.php?f=29",  # Web development forum
-            "item_selector": "li.threadbit",
-            "title_selector": "a.title",
-            "preview_selector": "div.threadbit-preview",
-        },
-        "maultalk": {
-            "name": "MaulTalk",
-            "base_url": "https://maultalk.com",
-            "search_path": "/forum/50-veb-razrabotka/",
-            "item_selector": "li.ipsDataItem",
-            "title_selector": "a.ipsDataItem_title",
-            "preview_selector": "div.ipsDataItem_meta",
-        },
+        "searchengines": ForumConfig(
+            name="SearchEngines.guru",
+            listing_url="https://searchengines.guru/forumdisplay.php?f=29",  # Web development forum
+            item_selector="li.threadbit",
+            title_selector="a.title",
+            preview_selector="div.threadbit-preview",
+        ),
+        "maultalk": ForumConfig(
+            name="MaulTalk",
+            listing_url="https://maultalk.com/forum/50-veb-razrabotka/",
+            item_selector="li.ipsDataItem",
+            title_selector="a.ipsDataItem_title",
+            preview_selector="div.ipsDataItem_meta",
+        ),
     }
 
+    # Words that mark a thread as a request for help
+    REQUEST_MARKERS = build_automaton([
+        "ищу", "нужен", "требуется", "закажу",
+        "посоветуйте", "подскажите", "помогите",
+        "looking for", "need", "want",
+    ])
+
+    # Post body and author markup across the supported forum engines
+    POST_SELECTOR = (
+        "div.postcontent, div.post-content, div.message-body, "
+        "article.message-body, div.cPost_contentWrap"
+    )
+    AUTHOR_SELECTOR = "a.username, span.author, a.ipsDataItem_author, div.postdetails a"
+
     def __init__(
         self,
         forums: Optional[list[str]] = None,
@@ -51,97 +79,65 @@ class ForumParser(BaseParser):
             return []
 
         config = self.FORUMS[forum_key]
-        url = config["base_url"] + config["search_path"]
-        html = await self.fetch_page(url)
+        html = await self.fetch_page_bytes(config.listing_url)
 
         if not html:
             return []
 
-        soup = self.parse_html(html)
+        tree = self.parse_tree(html)
         results = []
 
-        items = soup.select(config["item_selector"])
+        items = tree.css(config.item_selector)
 
         for item in items[:25]:  # Limit per forum
             try:
                 # Get title
-                title_el = item.select_one(config["title_selector"])
+                title_el = item.css_first(config.title_selector)
                 if not title_el:
                     continue
 
-                title = title_el.get_text(strip=True)
-                item_url = title_el.get("href", "")
-                if not item_url.startswith("http"):
-                    item_url = config["base_url"] + item_url
+                title = self.node_text(title_el)
+                item_url = urljoin(config.listing_url, title_el.attributes.get("href") or "")
 
                 # Get preview/description
-                preview_el = item.select_one(config["preview_selector"])
-                preview = preview_el.get_text(strip=True) if preview_el else ""
+                preview_el = item.css_first(config.preview_selector)
+                preview = self.node_text(preview_el) if preview_el else ""
 
                 # Look for "looking for" or request-type threads
                 full_text = f"{title} {preview}".lower()
-                request_markers = [
-                    "ищу", "нужен", "требуется", "закажу",
-                    "посоветуйте", "подскажите", "помогите",
-                    "looking for", "need", "want"
-                ]
-
-                is_request = any(marker in full_text for marker in request_markers)
+                is_request = matches_any(self.REQUEST_MARKERS, full_text)
 
-                if is_request and self.contains_keyword(full_text):
+                if is_request and self.contains_keyword(full_text, lowered=True):
                     results.append({
                         "title": title,
                         "url": item_url,
                         "preview": preview,
-                        "forum": config["name"],
+                        "forum": config.name,
                         "forum_key": forum_key,
                     })
 
             except Exception as e:
-                print(f"Error parsing {forum_key} item: {e}")
+                logger.debug("Error parsing %s item: %s", forum_key, e)
                 continue
 
         return results
 
     async def parse_thread(self, thread_url: str) -> Optional[dict]:
         """Parse a specific forum thread for more details."""
-        html = await self.fetch_page(thread_url)
+        html = await self.fetch_page_bytes(thread_url)
 
         if not html:
             return None
 
-        soup = self.parse_html(html)
-
-        # Try to get the first post content
-        post_selectors = [
-            "div.postcontent",
-            "div.post-content",
-            "div.message-body",
-            "article.message-body",
-            "div.cPost_contentWrap",
-        ]
-
-        content = ""
-        for selector in post_selectors:
-            post_el = soup.select_one(selector)
-            if post_el:
-                content = post_el.get_text(strip=True)
-                break
-
-        # Try to get author info
-        author_selectors = [
-            "a.username",
-            "span.author",
-            "a.ipsDataItem_author",
-            "div.postdetails a",
-        ]
-
-        author = ""
-        for selector in author_selectors:
-            author_el = soup.select_one(selector)
-            if author_el:
-                author = author_el.get_text(strip=True)
-                break
+        tree = self.parse_tree(html)
+
+        # Get the first post content
+        post_el = tree.css_first(self.POST_SELECTOR)
+        content = self.node_text(post_el) if post_el else ""
+
+        # Get author info
+        author_el = tree.css_first(self.AUTHOR_SELECTOR)
+        author = self.node_text(author_el) if author_el else ""
 
         return {
             "content": content,
@@ -165,7 +161,7 @@ class ForumParser(BaseParser):
             telegram=contacts.get("telegram"),
             website=contacts.get("website"),
             needs_description=text[:500] if text else thread["title"],
-            budget_mentioned=self.extract_budget(text),
+            budget_mentioned=contacts["budget"],
             urgency=self.estimate_urgency(text),
             raw_data={**thread, **(details or {})},
         )
@@ -174,13 +170,10 @@ class ForumParser(BaseParser):
         """Search for leads in forums."""
         results_count = 0
 
-        for forum_key in self.forums:
-            if results_count >= max_results:
-                break
-
-            try:
-                threads = await self.parse_forum(forum_key)
-
+        calls = [(forum_key,) for forum_key in self.forums]
+        pages = self.iter_pages(self.parse_forum, calls)
+        async with aclosing(pages):
+            async for threads in pages:
                 for thread in threads:
                     if results_count >= max_results:
                         break
@@ -193,8 +186,5 @@ class ForumParser(BaseParser):
                     yield lead
                     results_count += 1
 
-            except Exception as e:
-                print(f"Error searching {forum_key}: {e}")
-                continue
-
-        await self.close()
+                if results_count >= max_results:
+                    break
@@ -1,41 +1,54 @@
 """Parser for freelance platforms (FL.ru, Kwork, etc.)."""
 
+import logging
 import re
+from contextlib import aclosing
+from dataclasses import dataclass
 from typing import AsyncGenerator, Optional
+from urllib.parse import urljoin
 from datetime import datetime
 
 from app.parsers.base import BaseParser, ParsedLead
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PlatformConfig:
+    """Where a platform lists its projects and how to read them."""
+    listing_url: str
+    item_selector: str
+    title_selector: str
+    desc_selector: str
+    price_selector: str
+
 
 class FreelanceParser(BaseParser):
     """Parser for Russian freelance platforms."""
 
     # Freelance platform configurations
     PLATFORMS = {
-        "fl.ru": {
-            "base_url": "https://www.fl.ru",
-            "search_path": "/projects/?kind=5&category=37",  # Web development category
-            "item_selector": "div.b-post",
-            "title_selector": "a.b-post__link",
-            "desc_selector": "div.b-post__body",
-            "price_selector": "div.b-post__price",
-        },
-        "kwork": {
-            "base_url": "https://kwork.ru",
-            "search_path": "/projects?c=41",  # Sites and landing pages
-            "item_selector": "div.wants-card",
-            "title_selector": "a.wants-card__header-title",
-            "desc_selector": "div.wants-card__description",
-            "price_selector": "div.wants-card__header-price",
-        },
-        "habr_freelance": {
-            "base_url": "https://freelance.habr.com",
-            "search_path": "/tasks?categories=development_all_inclusive,development_sites",
-            "item_selector": "article.task",
-            "title_selector": "a.task__title",
-            "desc_selector": "div.task__description",
-            "price_selector": "span.task__price",
-        },
+        "fl.ru": PlatformConfig(
+            listing_url="https://www.fl.ru/projects/?kind=5&category=37",  # Web development category
+            item_selector="div.b-post",
+            title_selector="a.b-post__link",
+            desc_selector="div.b-post__body",
+            price_selector="div.b-post__price",
+        ),
+        "kwork": PlatformConfig(
+            listing_url="https://kwork.ru/projects?c=41",  # Sites and landing pages
+            item_selector="div.wants-card",
+            title_selector="a.wants-card__header-title",
+            desc_selector="div.wants-card__description",
+            price_selector="div.wants-card__header-price",
+        ),
+        "habr_freelance": PlatformConfig(
+            listing_url="https://freelance.habr.com/tasks?categories=development_all_inclusive,development_sites",
+            item_selector="article.task",
+            title_selector="a.task__title",
+            desc_selector="div.task__description",
+            price_selector="span.task__price",
+        ),
     }
 
     def __init__(
@@ -59,43 +72,44 @@ class FreelanceParser(BaseParser):
             return []
 
         config = self.PLATFORMS[platform_name]
-        url = config["base_url"] + config["search_path"]
-        html = await self.fetch_page(url)
+        html = await self.fetch_page_bytes(config.listing_url)
 
         if not html:
             return []
 
-        soup = self.parse_html(html)
+        tree = self.parse_tree(html)
         results = []
 
-        items = soup.select(config["item_selector"])
+        items = tree.css(config.item_selector)
 
         for item in items[:30]:  # Limit to 30 items per platform
             try:
                 # Get title
-                title_el = item.select_one(config["title_selector"])
+                title_el = item.css_first(config.title_selector)
                 if not title_el:
                     continue
 
-                title = title_el.get_text(strip=True)
-                item_url = title_el.get("href", "")
-                if not item_url.startswith("http"):
-                    item_url = config["base_url"] + item_url
+                title = self.node_text(title_el)
 
                 # Get description
-                desc_el = item.select_one(config["desc_selector"])
-                description = desc_el.get_text(strip=True) if desc_el else ""
+                desc_el = item.css_first(config.desc_selector)
+                description = self.node_text(desc_el) if desc_el else ""
 
-                # Get price/budget
-                price_el = item.select_one(config["price_selector"])
-                price = price_el.get_text(strip=True) if price_el else None
-
-                # Check for relevant keywords
-                full_text = f"{title} {description}"
-                if not self.contains_keyword(full_text):
+                # Check for relevant keywords before reading the rest of the item
+                text = f"{title} {description}"
+                text_lower = text.lower()
+                if not self.contains_keyword(text_lower, lowered=True):
                     continue
 
+                item_url = urljoin(config.listing_url, title_el.attributes.get("href") or "")
+
+                # Get price/budget
+                price_el = item.css_first(config.price_selector)
+                price = self.node_text(price_el) if price_el else None
+
                 results.append({
+                    "text": text,
+                    "text_lower": text_lower,
                     "title": title,
                     "url": item_url,
                     "description": description,
@@ -104,14 +118,14 @@ class FreelanceParser(BaseParser):
                 })
 
             except Exception as e:
-                print(f"Error parsing {platform_name} item: {e}")
+                logger.debug("Error parsing %s item: %s", platform_name, e)
                 continue
 
         return results
 
     def create_lead_from_project(self, project: dict) -> ParsedLead:
         """Create a ParsedLead from a freelance project."""
-        text = f"{project['title']} {project['description']}"
+        text = project["text"]
         contacts = self.extract_contacts(text)
 
         return ParsedLead(
@@ -124,7 +138,7 @@ class FreelanceParser(BaseParser):
             website=contacts.get("website"),
             needs_description=project["description"][:500] if project["description"] else project["title"],
             budget_mentioned=project.get("price"),
-            urgency=self.estimate_urgency(text),
+            urgency=self.estimate_urgency(project["text_lower"], lowered=True),
             raw_data=project,
         )
 
@@ -132,13 +146,10 @@ class FreelanceParser(BaseParser):
         """Search for leads on freelance platforms."""
         results_count = 0
 
-        for platform in self.platforms:
-            if results_count >= max_results:
-                break
-
-            try:
-                projects = await self.parse_platform(platform)
-
+        calls = [(platform,) for platform in self.platforms]
+        pages = self.iter_pages(self.parse_platform, calls)
+        async with aclosing(pages):
+            async for projects in pages:
                 for project in projects:
                     if results_count >= max_results:
                         break
@@ -147,11 +158,8 @@ class FreelanceParser(BaseParser):
                     yield lead
                     results_count += 1
 
-            except Exception as e:
-                print(f"Error searching {platform}: {e}")
-                continue
-
-        await self.close()
+                if results_count >= max_results:
+                    break
 
 
 class KworkParser(FreelanceParser):
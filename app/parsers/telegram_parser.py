@@ -1,11 +1,16 @@
 """Parser for Telegram channels and chats (via web preview)."""
 
-import re
+import logging
+from contextlib import aclosing
 from typing import AsyncGenerator, Optional
 from datetime import datetime
 
+import re2
+
 from app.parsers.base import BaseParser, ParsedLead
 
+logger = logging.getLogger(__name__)
+
 
 class TelegramParser(BaseParser):
     """Parser for Telegram channels via t.me web preview."""
@@ -19,6 +24,13 @@ class TelegramParser(BaseParser):
         "devjobs",
     ]
 
+    # Phrases a sender uses to introduce themselves, in Russian
+    NAME_PATTERNS = (
+        re2.compile(r"(?i)меня зовут\s+([А-Яа-яЁёA-Za-z]+)"),
+        re2.compile(r"(?i)я\s+([А-Яа-яЁёA-Za-z]+)"),
+        re2.compile(r"(?i)обращаться к\s+([А-Яа-яЁёA-Za-z]+)"),
+    )
+
     def __init__(
         self,
         channels: Optional[list[str]] = None,
@@ -37,59 +49,61 @@ class TelegramParser(BaseParser):
     async def parse_channel_page(self, channel: str) -> list[dict]:
         """Parse a Telegram channel's web preview."""
         url = f"https://t.me/s/{channel}"
-        html = await self.fetch_page(url)
+        channel_telegram = f"@{channel}"
+        html = await self.fetch_page_bytes(url)
 
         if not html:
             return []
 
-        soup = self.parse_html(html)
+        tree = self.parse_tree(html)
         messages = []
 
         # Find all message widgets
-        message_widgets = soup.find_all("div", class_="tgme_widget_message_wrap")
+        message_widgets = tree.css("div.tgme_widget_message_wrap")
 
         for widget in message_widgets:
             try:
                 # Get message text
-                text_div = widget.find("div", class_="tgme_widget_message_text")
+                text_div = widget.css_first("div.tgme_widget_message_text")
                 if not text_div:
                     continue
 
-                text = text_div.get_text(strip=True)
+                text = self.node_text(text_div)
 
                 # Skip if no relevant keywords
                 if not self.contains_keyword(text):
                     continue
 
                 # Get message link
-                link_tag = widget.find("a", class_="tgme_widget_message_date")
-                message_link = link_tag.get("href") if link_tag else url
+                link_tag = widget.css_first("a.tgme_widget_message_date")
+                message_link = link_tag.attributes.get("href") if link_tag else url
 
                 # Get post date
-                time_tag = widget.find("time")
+                time_tag = widget.css_first("time")
                 post_date = None
-                if time_tag and time_tag.get("datetime"):
+                post_datetime = time_tag.attributes.get("datetime") if time_tag else None
+                if post_datetime:
                     try:
-                        post_date = datetime.fromisoformat(
-                            time_tag.get("datetime").replace("Z", "+00:00")
-                        )
+                        # Python 3.11+ parses a trailing "Z" as UTC
+                        post_date = datetime.fromisoformat(post_datetime)
                     except ValueError:
                         pass
 
                 # Get author info if available
-                author_tag = widget.find("a", class_="tgme_widget_message_owner_name")
-                author_name = author_tag.get_text(strip=True) if author_tag else channel
+                author_tag = widget.css_first("a.tgme_widget_message_owner_name")
+                author_name = self.node_text(author_tag) if author_tag else channel
 
                 messages.append({
                     "text": text,
                     "url": message_link,
                     "channel": channel,
+                    "channel_telegram": channel_telegram,
                     "author": author_name,
                     "date": post_date or datetime.utcnow(),
                 })
 
             except Exception as e:
-                print(f"Error parsing message in {channel}: {e}")
+                logger.debug("Error parsing message in %s: %s", channel, e)
                 continue
 
         return messages
@@ -102,15 +116,8 @@ class TelegramParser(BaseParser):
         # Try to extract a name from the text
         name = message.get("author", "Unknown")
 
-        # Look for name patterns in Russian
-        name_patterns = [
-            r"меня зовут\s+([А-Яа-яЁёA-Za-z]+)",
-            r"я\s+([А-Яа-яЁёA-Za-z]+)",
-            r"обращаться к\s+([А-Яа-яЁёA-Za-z]+)",
-        ]
-
-        for pattern in name_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in self.NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 name = match.group(1)
                 break
@@ -121,12 +128,12 @@ class TelegramParser(BaseParser):
             original_request=text,
             email=contacts.get("email"),
             phone=contacts.get("phone"),
-            telegram=contacts.get("telegram") or f"@{message['channel']}",
+            telegram=contacts.get("telegram") or message["channel_telegram"],
             website=contacts.get("website"),
             needs_description=text[:500],
-            budget_mentioned=self.extract_budget(text),
+            budget_mentioned=contacts["budget"],
             urgency=self.estimate_urgency(text),
-            found_at=message.get("date", datetime.utcnow()),
+            found_at=message.get("date") or datetime.utcnow(),
             raw_data=message,
         )
 
@@ -134,13 +141,10 @@ class TelegramParser(BaseParser):
         """Search for leads in Telegram channels."""
         results_count = 0
 
-        for channel in self.channels:
-            if results_count >= max_results:
-                break
-
-            try:
-                messages = await self.parse_channel_page(channel)
-
+        calls = [(channel,) for channel in self.channels]
+        pages = self.iter_pages(self.parse_channel_page, calls)
+        async with aclosing(pages):
+            async for messages in pages:
                 for message in messages:
                     if results_count >= max_results:
                         break
@@ -149,8 +153,5 @@ class TelegramParser(BaseParser):
                     yield lead
                     results_count += 1
 
-            except Exception as e:
-                print(f"Error searching channel {channel}: {e}")
-                continue
-
-        await self.close()
+                if results_count >= max_results:
+                    break
@@ -17,8 +17,10 @@ from app.schemas.source import (
 from app.schemas.proposal import (
     ProposalBase,
     ProposalCreate,
+    ProposalUpdate,
     ProposalResponse,
     ProposalGenerateRequest,
+    ProposalGenerateResponse,
 )
 
 __all__ = [
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl
 
 from app.models.lead import LeadStatus
 
@@ -54,6 +54,9 @@ class LeadUpdate(BaseModel):
 
 class WebsiteAnalysisResponse(BaseModel):
     """Schema for website analysis in lead response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
     url: str
     is_accessible: bool
     overall_score: Optional[float] = None
@@ -62,12 +65,12 @@ class WebsiteAnalysisResponse(BaseModel):
     improvement_suggestions: Optional[list] = None
     analyzed_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class LeadResponse(LeadBase):
     """Schema for Lead response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     source_id: Optional[int] = None
     source_url: Optional[str] = None
@@ -84,9 +87,6 @@ class LeadResponse(LeadBase):
     updated_at: datetime
     website_analysis: Optional[WebsiteAnalysisResponse] = None
 
-    class Config:
-        from_attributes = True
-
 
 class LeadListResponse(BaseModel):
     """Schema for paginated lead list response."""
@@ -95,6 +95,7 @@ class LeadListResponse(BaseModel):
     page: int
     per_page: int
     pages: int
+    next_cursor: Optional[str] = None
 
 
 class LeadSearchFilters(BaseModel):
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.proposal import ProposalStatus, ProposalChannel
 
@@ -33,6 +33,9 @@ class ProposalUpdate(BaseModel):
 
 class ProposalResponse(ProposalBase):
     """Schema for Proposal response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     lead_id: int
     status: ProposalStatus
@@ -46,9 +49,6 @@ class ProposalResponse(ProposalBase):
     opened_at: Optional[datetime] = None
     replied_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 class ProposalGenerateRequest(BaseModel):
     """Request schema for generating a proposal."""
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.source import SourceType
 
@@ -37,6 +37,9 @@ class SourceUpdate(BaseModel):
 
 class SourceResponse(SourceBase):
     """Schema for Source response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     total_leads_found: int
     qualified_leads_count: int
@@ -45,9 +48,6 @@ class SourceResponse(SourceBase):
     updated_at: datetime
     conversion_rate: float
 
-    class Config:
-        from_attributes = True
-
 
 class SourceStats(BaseModel):
     """Statistics for a source."""
@@ -0,0 +1,150 @@
+"""Shared OpenAI client for AI-assisted services."""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+
+from app.cache import response_cache
+from app.config import settings
+
+# One client per process, so its connection pool is reused across requests
+_openai_client = None
+_rate_limiter = None
+
+# Completion text by request hash, least recently used first
+_completions: OrderedDict[bytes, str] = OrderedDict()
+# Requests in flight, so identical concurrent prompts share one call
+_pending: dict[bytes, asyncio.Task] = {}
+
+# Payload of a Markdown code fence some models wrap their JSON in
+JSON_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` calls per `period` seconds, with bursts up to `rate`."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a call is allowed and take a token for it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate,
+                    self._tokens + (now - self._updated) * self.rate / self.period,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Get the shared limiter for AI requests, or None when pacing is disabled."""
+    global _rate_limiter
+    if settings.ai_requests_per_minute <= 0:
+        return None
+
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(settings.ai_requests_per_minute)
+    return _rate_limiter
+
+
+def get_openai_client():
+    """Get the shared OpenAI client, or None when no API key is configured."""
+    global _openai_client
+    if not settings.openai_api_key:
+        return None
+
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+        _openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+    return _openai_client
+
+
+async def close_openai_client():
+    """Close the shared OpenAI client if one was created."""
+    if _openai_client is not None:
+        await _openai_client.close()
+
+
+async def create_completion(client, **params) -> str:
+    """Create a chat completion and return its text."""
+    # Pace requests to the account quota instead of running into 429s
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        await limiter.acquire()
+
+    response = await client.chat.completions.create(**params)
+    return response.choices[0].message.content
+
+
+async def _load_completion(client, key: bytes, params: dict) -> str:
+    """Get a completion from Redis when configured, else from the API."""
+    if not settings.redis_url:
+        return await create_completion(client, **params)
+
+    # Answers outlive the process in Redis
+    cache_key = f"ai:{key.hex()}"
+    content = await response_cache.get(cache_key)
+    if content is None:
+        content = await create_completion(client, **params)
+        await response_cache.set(cache_key, content, settings.ai_cache_seconds)
+    return content
+
+
+async def cached_completion(client, **params) -> str:
+    """Create a chat completion, reusing the text of an identical earlier request.
+
+    Only use this where the same prompt should get the same answer.
+    """
+    if settings.ai_cache_size <= 0:
+        return await create_completion(client, **params)
+
+    key = hashlib.blake2b(
+        orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).digest()
+
+    if key in _completions:
+        _completions.move_to_end(key)
+        return _completions[key]
+
+    task = _pending.get(key)
+    if task is None:
+        task = asyncio.create_task(_fill_completion(client, key, params))
+        _pending[key] = task
+    # Shielded for every caller, so one cancelled caller (a client disconnect)
+    # neither cancels the others nor keeps the answer out of the cache
+    return await asyncio.shield(task)
+
+
+async def _fill_completion(client, key: bytes, params: dict) -> str:
+    """Load a completion and remember it, for the task shared by identical requests."""
+    try:
+        content = await _load_completion(client, key, params)
+    finally:
+        del _pending[key]
+
+    _completions[key] = content
+    if len(_completions) > settings.ai_cache_size:
+        _completions.popitem(last=False)
+    return content
+
+
+def parse_json_reply(content: str) -> Any:
+    """Parse a JSON completion, unwrapping it from a code fence if present."""
+    match = JSON_FENCE_PATTERN.search(content)
+    return orjson.loads(match.group(1) if match else content)
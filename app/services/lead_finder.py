@@ -1,10 +1,12 @@
 """Lead finder service - orchestrates lead discovery from multiple sources."""
 
 import asyncio
+import logging
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Lead, Source, LeadStatus, SourceType
@@ -18,6 +20,8 @@ from app.parsers import (
 )
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class LeadFinderService:
     """Service for finding and storing leads from multiple sources."""
@@ -33,6 +37,8 @@ class LeadFinderService:
     def __init__(self, db: AsyncSession):
         """Initialize the lead finder service."""
         self.db = db
+        # Sources already loaded or created in this session, by (name, type)
+        self._sources: dict[tuple[str, SourceType], Source] = {}
 
     async def get_or_create_source(
         self,
@@ -42,6 +48,10 @@ class LeadFinderService:
         **kwargs
     ) -> Source:
         """Get existing source or create a new one."""
+        key = (name, source_type)
+        if key in self._sources:
+            return self._sources[key]
+
         result = await self.db.execute(
             select(Source).where(
                 Source.name == name,
@@ -60,91 +70,184 @@ class LeadFinderService:
             self.db.add(source)
             await self.db.flush()
 
+        self._sources[key] = source
         return source
 
-    async def check_duplicate(self, parsed_lead: ParsedLead) -> bool:
-        """Check if a similar lead already exists."""
-        # Check by source URL (most reliable)
-        if parsed_lead.source_url:
-            result = await self.db.execute(
-                select(Lead).where(Lead.source_url == parsed_lead.source_url)
-            )
-            if result.scalar_one_or_none():
-                return True
-
-        # Check by email if available
-        if parsed_lead.email:
-            result = await self.db.execute(
-                select(Lead).where(Lead.email == parsed_lead.email)
-            )
-            if result.scalar_one_or_none():
-                return True
+    @staticmethod
+    def lead_keys(parsed_lead: ParsedLead) -> set[tuple[str, str]]:
+        """Get the (column, value) pairs that identify a parsed lead."""
+        keys = {
+            ("source_url", parsed_lead.source_url),
+            ("email", parsed_lead.email),
+            ("telegram", parsed_lead.telegram),
+        }
+        return {key for key in keys if key[1]}
+
+    async def find_existing_keys(self, batch: list[ParsedLead]) -> set[tuple[str, str]]:
+        """Get the identifying pairs of a batch that already belong to stored leads."""
+        values = {"source_url": set(), "email": set(), "telegram": set()}
+        for parsed_lead in batch:
+            for column, value in self.lead_keys(parsed_lead):
+                values[column].add(value)
+
+        # One query for the whole batch instead of up to three per lead
+        conditions = [
+            getattr(Lead, column).in_(column_values)
+            for column, column_values in values.items()
+            if column_values
+        ]
+        if not conditions:
+            return set()
 
-        # Check by telegram if available
-        if parsed_lead.telegram:
-            result = await self.db.execute(
-                select(Lead).where(Lead.telegram == parsed_lead.telegram)
-            )
-            if result.scalar_one_or_none():
-                return True
+        result = await self.db.execute(
+            select(Lead.source_url, Lead.email, Lead.telegram).where(or_(*conditions))
+        )
 
-        return False
+        existing = set()
+        for row in result:
+            existing |= {
+                ("source_url", row.source_url),
+                ("email", row.email),
+                ("telegram", row.telegram),
+            }
+        return existing
 
-    async def create_lead_from_parsed(
+    def lead_values_from_parsed(
         self,
         parsed_lead: ParsedLead,
         source: Source
-    ) -> Lead:
-        """Create a Lead model from parsed data."""
-        lead = Lead(
-            name=parsed_lead.name,
-            company_name=parsed_lead.company_name,
-            email=parsed_lead.email,
-            phone=parsed_lead.phone,
-            telegram=parsed_lead.telegram,
-            website=parsed_lead.website,
-            social_links=parsed_lead.social_links,
-            business_description=parsed_lead.business_description,
-            industry=parsed_lead.industry,
-            original_request=parsed_lead.original_request,
-            needs_description=parsed_lead.needs_description,
-            budget_mentioned=parsed_lead.budget_mentioned,
-            urgency=parsed_lead.urgency,
-            source_id=source.id,
-            source_url=parsed_lead.source_url,
-            found_at=parsed_lead.found_at,
-            status=LeadStatus.NEW,
-        )
+    ) -> dict:
+        """Build Lead column values from parsed data."""
+        return {
+            "name": parsed_lead.name,
+            "company_name": parsed_lead.company_name,
+            "email": parsed_lead.email,
+            "phone": parsed_lead.phone,
+            "telegram": parsed_lead.telegram,
+            "website": parsed_lead.website,
+            "social_links": parsed_lead.social_links,
+            "business_description": parsed_lead.business_description,
+            "industry": parsed_lead.industry,
+            "original_request": parsed_lead.original_request,
+            "needs_description": parsed_lead.needs_description,
+            "budget_mentioned": parsed_lead.budget_mentioned,
+            "urgency": parsed_lead.urgency,
+            "source_id": source.id,
+            "source_url": parsed_lead.source_url,
+            "found_at": parsed_lead.found_at,
+            "status": LeadStatus.NEW,
+        }
 
-        self.db.add(lead)
-        return lead
+    def insert_leads(self):
+        """Build a Lead INSERT that skips rows conflicting with a unique index."""
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(Lead).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            return sqlite.insert(Lead).on_conflict_do_nothing()
+        return insert(Lead)
 
     async def search_source(
         self,
         parser: BaseParser,
         source: Source,
-        max_results: int = 50
+        max_results: int = 50,
+        batch_size: int = 16,
     ) -> list[Lead]:
         """Search a single source and store found leads."""
-        leads_found = []
-        new_leads = 0
+        [leads_found] = await self.store_searches([(source, parser)], max_results, batch_size)
+        if isinstance(leads_found, BaseException):
+            raise leads_found
+        return leads_found
+
+    async def store_searches(
+        self,
+        searches: list[tuple[Source, BaseParser]],
+        max_results: int = 50,
+        batch_size: int = 16,
+    ) -> list[list[Lead] | BaseException]:
+        """Run the searches and store their leads as batches arrive.
+
+        Returns the stored leads of each search, or the error that stopped it.
+        """
+        # Parsers keep fetching while earlier batches are written; the
+        # bounded queue stops them from running far ahead of the database
+        queue: asyncio.Queue = asyncio.Queue(maxsize=32)
+        outcomes: list[list[Lead] | BaseException] = [[] for _ in searches]
+        # Leads from the current search are not in the database yet
+        seen = [set() for _ in searches]
+
+        async def produce(index: int, parser: BaseParser):
+            try:
+                async for batch in parser.search_batches(max_results, batch_size):
+                    await queue.put((index, batch))
+            except Exception as e:
+                await queue.put((index, e))
+
+        async def produce_all():
+            await asyncio.gather(
+                *(produce(index, parser) for index, (_, parser) in enumerate(searches))
+            )
+            await queue.put(None)
+
+        async def consume():
+            # The session runs one query at a time, so a single consumer writes
+            while (item := await queue.get()) is not None:
+                index, batch = item
+                if isinstance(outcomes[index], BaseException):
+                    continue
+                if isinstance(batch, BaseException):
+                    outcomes[index] = batch
+                    continue
+                try:
+                    source = searches[index][0]
+                    outcomes[index].extend(await self.store_batch(batch, source, seen[index]))
+                except Exception as e:
+                    outcomes[index] = e
+
+        await asyncio.gather(produce_all(), consume())
+
+        # One timestamp for the whole run, so the flush can batch the
+        # source updates into an executemany
+        searched_at = datetime.utcnow()
+        for (source, _), outcome in zip(searches, outcomes):
+            if not isinstance(outcome, BaseException):
+                source.last_search_at = searched_at
+
+        return outcomes
+
+    async def store_batch(
+        self,
+        batch: list[ParsedLead],
+        source: Source,
+        seen: set,
+    ) -> list[Lead]:
+        """Store new leads from a batch; `seen` holds keys of leads stored earlier in the run."""
+        existing = await self.find_existing_keys(batch)
+
+        rows = []
+        for parsed_lead in batch:
+            keys = self.lead_keys(parsed_lead)
 
-        async for parsed_lead in parser.search(max_results):
             # Skip duplicates
-            if await self.check_duplicate(parsed_lead):
+            if keys & seen or keys & existing:
                 continue
+            seen |= keys
 
-            # Create and store lead
-            lead = await self.create_lead_from_parsed(parsed_lead, source)
-            leads_found.append(lead)
-            new_leads += 1
+            rows.append(self.lead_values_from_parsed(parsed_lead, source))
 
-            # Update source statistics
-            source.total_leads_found += 1
+        if not rows:
+            return []
 
-        source.last_search_at = datetime.utcnow()
+        # One multi-row INSERT per batch; rows already stored by a
+        # concurrent search are skipped and not returned
+        result = await self.db.execute(self.insert_leads().returning(Lead), rows)
+        inserted = result.scalars().all()
 
-        return leads_found
+        # Update source statistics
+        source.total_leads_found += len(inserted)
+
+        return inserted
 
     async def search_all_sources(
         self,
@@ -170,33 +273,35 @@ class LeadFinderService:
         if not sources:
             sources = await self._create_default_sources()
 
-        # Search each source
+        def record_error(source: Source, error: BaseException):
+            error_msg = f"Error searching {source.name}: {str(error)}"
+            results["errors"].append(error_msg)
+            logger.warning(error_msg)
+
+        # Create a parser per source from its configuration
+        searches = []
         for source in sources:
-            try:
-                parser_class = self.PARSER_REGISTRY.get(source.source_type)
-                if not parser_class:
-                    continue
+            parser_class = self.PARSER_REGISTRY.get(source.source_type)
+            if not parser_class:
+                continue
 
-                # Create parser with source configuration
+            try:
                 parser_config = source.parser_config or {}
-                keywords = source.search_keywords
-
-                parser = parser_class(keywords=keywords, **parser_config)
+                parser = parser_class(keywords=source.search_keywords, **parser_config)
+            except Exception as e:
+                record_error(source, e)
+                continue
+            searches.append((source, parser))
 
-                # Perform search
-                leads = await self.search_source(
-                    parser,
-                    source,
-                    max_results_per_source
-                )
+        outcomes = await self.store_searches(searches, max_results_per_source)
 
-                results["by_source"][source.name] = len(leads)
-                results["total_found"] += len(leads)
+        for (source, _), leads in zip(searches, outcomes):
+            if isinstance(leads, BaseException):
+                record_error(source, leads)
+                continue
 
-            except Exception as e:
-                error_msg = f"Error searching {source.name}: {str(e)}"
-                results["errors"].append(error_msg)
-                print(error_msg)
+            results["by_source"][source.name] = len(leads)
+            results["total_found"] += len(leads)
 
         await self.db.commit()
         return results
@@ -227,9 +332,23 @@ class LeadFinderService:
             },
         ]
 
+        # Load the existing defaults in one query instead of one per source
+        result = await self.db.execute(
+            select(Source).where(
+                Source.name.in_([data["name"] for data in default_sources])
+            )
+        )
+        for source in result.scalars():
+            self._sources[(source.name, source.source_type)] = source
+
         sources = []
         for source_data in default_sources:
-            source = await self.get_or_create_source(**source_data)
+            key = (source_data["name"], source_data["source_type"])
+            source = self._sources.get(key)
+            if source is None:
+                source = Source(**source_data)
+                self.db.add(source)
+                self._sources[key] = source
             sources.append(source)
 
         await self.db.flush()
@@ -1,14 +1,75 @@
 """Lead qualifier service - qualifies and scores leads using AI and rules."""
 
+import asyncio
 import json
+import logging
 import re
-from typing import Optional
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Optional
 
+import ahocorasick
+import re2
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Lead, LeadStatus, WebsiteAnalysis
+from app.models import Lead, LeadStatus
+from app.models.lead import HOT_LEADS_FILTER
 from app.config import settings
+from app.services.ai_client import cached_completion, get_openai_client, parse_json_reply
+
+logger = logging.getLogger(__name__)
+
+
+# Characters that make a pattern more than a plain substring
+REGEX_METACHARACTERS = re.compile(r"[\\.^$*+?{}\[\]|()]")
+
+
+@dataclass(frozen=True, slots=True)
+class PatternSet:
+    """Patterns split into plain substrings and one alternation of the real regexes."""
+    literals: tuple[str, ...]
+    regexes: tuple[str, ...]
+    regex: Optional[Any]
+
+    @classmethod
+    def compile(cls, patterns: list[str], engine: ModuleType = re) -> "PatternSet":
+        """Compile lowercase patterns; plain words are checked with `in` instead of regex.
+
+        `engine` is `re` or `re2`; RE2 is much faster on large alternations but
+        its \\b and \\d only know ASCII.
+        """
+        literals = tuple(p for p in patterns if not REGEX_METACHARACTERS.search(p))
+        regexes = tuple(p for p in patterns if p not in literals)
+        # Named groups tell which regex matched
+        regex = engine.compile(
+            "|".join(f"(?P<p{index}>{pattern})" for index, pattern in enumerate(regexes))
+        ) if regexes else None
+        return cls(literals, regexes, regex)
+
+    def search(self, text: str) -> Optional[str]:
+        """Get a pattern found in text, or None."""
+        for literal in self.literals:
+            if literal in text:
+                return literal
+        if self.regex is not None:
+            match = self.regex.search(text)
+            if match:
+                return self.regexes[int(match.lastgroup[1:])]
+        return None
+
+
+def build_industry_automaton(industry_keywords: dict[str, list[str]]) -> ahocorasick.Automaton:
+    """Compile industry keywords into an automaton whose values are (rank, industry)."""
+    automaton = ahocorasick.Automaton()
+    for rank, (industry, keywords) in enumerate(industry_keywords.items()):
+        for keyword in keywords:
+            keyword = keyword.lower()
+            # A keyword listed under several industries belongs to the first
+            if keyword not in automaton:
+                automaton.add_word(keyword, (rank, industry))
+    automaton.make_automaton()
+    return automaton
 
 
 class LeadQualifierService:
@@ -27,50 +88,78 @@ class LeadQualifierService:
         "tech": ["IT", "технолог", "software", "приложение", "app", "tech"],
         "manufacturing": ["производств", "завод", "фабрик", "manufacturing", "factory"],
     }
+    INDUSTRY_AUTOMATON = build_industry_automaton(INDUSTRY_KEYWORDS)
 
     # Budget indicators
     BUDGET_INDICATORS = {
         "high": [
-            r"\d{3,}\s*(?:тыс|k|К)",  # 100k+
-            r"(?:от|from)\s*\d{2,}\s*(?:тыс|k|К)",
+            r"\d{3,}\s*(?:тыс|k|к)",  # 100k+
+            r"(?:от|from)\s*\d{2,}\s*(?:тыс|k|к)",
             r"бюджет\s*(?:не\s*)?ограничен",
             r"budget\s*(?:is\s*)?(?:not\s*)?limited",
         ],
         "medium": [
-            r"(?:30|40|50|60|70|80|90)\s*(?:тыс|k|К)",
-            r"(?:от|from)\s*(?:30|40|50)\s*(?:тыс|k|К)",
+            r"(?:30|40|50|60|70|80|90)\s*(?:тыс|k|к)",
+            r"(?:от|from)\s*(?:30|40|50)\s*(?:тыс|k|к)",
         ],
         "low": [
-            r"(?:5|10|15|20|25)\s*(?:тыс|k|К)",
-            r"(?:до|up\s*to)\s*(?:20|30)\s*(?:тыс|k|К)",
+            r"(?:5|10|15|20|25)\s*(?:тыс|k|к)",
+            r"(?:до|up\s*to)\s*(?:20|30)\s*(?:тыс|k|к)",
             r"минимальн|cheap|дешев",
         ],
     }
 
-    # Urgency indicators
+    # Urgency indicators; single words are stems and match inside longer
+    # words, multi-word phrases are anchored at both ends
     URGENCY_INDICATORS = {
         "urgent": [
             r"срочно",
             r"asap",
             r"urgent",
-            r"как\s*можно\s*скорее",
+            r"\bкак\s+можно\s+скорее\b",
             r"сегодня",
             r"завтра",
         ],
         "high": [
             r"быстро",
             r"скоро",
-            r"на\s*этой\s*неделе",
-            r"в\s*ближайшее\s*время",
-            r"this\s*week",
+            r"\bна\s+этой\s+неделе\b",
+            r"\bв\s+ближайшее\s+время\b",
+            r"\bthis\s+week\b",
         ],
         "medium": [
-            r"в\s*течение\s*месяца",
-            r"на\s*следующей\s*неделе",
-            r"next\s*week",
+            r"\bв\s+течение\s+месяца\b",
+            r"\bна\s+следующей\s+неделе\b",
+            r"\bnext\s+week\b",
         ],
     }
 
+    # Fixed instructions go first so every request shares the same prompt
+    # prefix, which the API caches; only the lead data follows
+    AI_SYSTEM_PROMPT = """Ты - эксперт по квалификации лидов для веб-студии. Отвечай только валидным JSON.
+
+Проанализируй потенциального клиента для веб-студии и оцени его по следующим критериям.
+
+Ответь в формате JSON:
+{
+    "industry": "отрасль бизнеса",
+    "budget_score": 0-100,
+    "urgency_score": 0-100,
+    "fit_score": 0-100,
+    "is_spam": true/false,
+    "spam_reason": "причина если спам",
+    "project_type": "тип проекта (лендинг, корпоративный сайт, интернет-магазин, etc)",
+    "estimated_budget_range": "примерный диапазон бюджета",
+    "key_needs": ["потребность1", "потребность2"],
+    "notes": "краткие заметки о лиде"
+}
+
+Оценивай строго:
+- budget_score: 0-30 для маленьких бюджетов, 30-60 для средних, 60-100 для больших
+- urgency_score: выше если есть срочность
+- fit_score: насколько этот лид подходит как клиент для веб-студии
+"""
+
     # Disqualification patterns (spam, not relevant)
     DISQUALIFY_PATTERNS = [
         r"бесплатно",
@@ -84,63 +173,78 @@ class LeadQualifierService:
         r"(?:адалт|adult|porn|xxx)",
     ]
 
+    # Patterns above, compiled once when the class is defined. Levels are
+    # tried in order, as the first matching level wins. Patterns are
+    # lowercase and run on lowercased text, so no IGNORECASE is needed.
+    BUDGET_PATTERNS = {
+        level: PatternSet.compile(patterns)
+        for level, patterns in BUDGET_INDICATORS.items()
+    }
+    URGENCY_PATTERNS = {
+        level: PatternSet.compile(patterns)
+        for level, patterns in URGENCY_INDICATORS.items()
+    }
+    # Checked on every lead; RE2 scans the alternation in one linear pass
+    # instead of backtracking through each branch at every position
+    DISQUALIFY_PATTERN_SET = PatternSet.compile(DISQUALIFY_PATTERNS, engine=re2)
+
     def __init__(self, db: AsyncSession, openai_client=None):
         """Initialize the qualifier service."""
         self.db = db
-        self.openai_client = openai_client
+        self.openai_client = openai_client or get_openai_client()
 
-    def detect_industry(self, text: str) -> Optional[str]:
-        """Detect industry from text."""
-        text_lower = text.lower()
+    def detect_industry(self, text: str, lowered: bool = False) -> Optional[str]:
+        """Detect industry from text (pass lowered=True for lowercase text)."""
+        text_lower = text if lowered else text.lower()
 
-        for industry, keywords in self.INDUSTRY_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    return industry
-
-        return None
-
-    def estimate_budget_level(self, text: str) -> tuple[str, float]:
-        """Estimate budget level and score from text."""
-        text_lower = text.lower()
-
-        for level, patterns in self.BUDGET_INDICATORS.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    if level == "high":
-                        return level, 85.0
-                    elif level == "medium":
-                        return level, 60.0
-                    else:
-                        return level, 35.0
+        # One pass over the text; the first industry in INDUSTRY_KEYWORDS
+        # with any keyword present wins
+        match = min(
+            (value for _, value in self.INDUSTRY_AUTOMATON.iter(text_lower)),
+            default=None,
+        )
+        return match[1] if match else None
+
+    def estimate_budget_level(self, text: str, lowered: bool = False) -> tuple[str, float]:
+        """Estimate budget level and score from text (pass lowered=True for lowercase text)."""
+        text_lower = text if lowered else text.lower()
+
+        for level, pattern in self.BUDGET_PATTERNS.items():
+            if pattern.search(text_lower) is not None:
+                if level == "high":
+                    return level, 85.0
+                elif level == "medium":
+                    return level, 60.0
+                else:
+                    return level, 35.0
 
         # Default: unknown budget
         return "unknown", 50.0
 
-    def estimate_urgency_level(self, text: str) -> tuple[str, float]:
-        """Estimate urgency level and score from text."""
-        text_lower = text.lower()
+    def estimate_urgency_level(self, text: str, lowered: bool = False) -> tuple[str, float]:
+        """Estimate urgency level and score from text (pass lowered=True for lowercase text)."""
+        text_lower = text if lowered else text.lower()
 
-        for level, patterns in self.URGENCY_INDICATORS.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    if level == "urgent":
-                        return level, 95.0
-                    elif level == "high":
-                        return level, 75.0
-                    else:
-                        return level, 55.0
+        for level, pattern in self.URGENCY_PATTERNS.items():
+            if pattern.search(text_lower) is not None:
+                if level == "urgent":
+                    return level, 95.0
+                elif level == "high":
+                    return level, 75.0
+                else:
+                    return level, 55.0
 
         # Default: normal urgency
         return "normal", 40.0
 
-    def check_disqualification(self, text: str) -> tuple[bool, Optional[str]]:
-        """Check if lead should be disqualified."""
-        text_lower = text.lower()
+    def check_disqualification(self, text: str, lowered: bool = False) -> tuple[bool, Optional[str]]:
+        """Check if lead should be disqualified (pass lowered=True for lead_text output)."""
+        # RE2's \s is ASCII-only, so other whitespace such as NBSP is collapsed first
+        text_lower = text if lowered else " ".join(text.split()).lower()
 
-        for pattern in self.DISQUALIFY_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                return True, f"Matched disqualification pattern: {pattern}"
+        pattern = self.DISQUALIFY_PATTERN_SET.search(text_lower)
+        if pattern is not None:
+            return True, f"Matched disqualification pattern: {pattern}"
 
         return False, None
 
@@ -190,6 +294,25 @@ class LeadQualifierService:
 
         return min(100.0, max(0.0, score))
 
+    def lead_text(self, lead: Lead) -> str:
+        """Get the lead's request texts combined, lowercased and with whitespace collapsed."""
+        text = " ".join(filter(None, [
+            lead.original_request or "",
+            lead.needs_description or "",
+            lead.business_description or "",
+        ]))
+        # Pasted listings often use NBSP, which the RE2 patterns don't treat as \s
+        return " ".join(text.split()).lower()
+
+    def apply_disqualification(self, lead: Lead, text_lower: str) -> bool:
+        """Disqualify the lead if its text matches a disqualification pattern."""
+        should_disqualify, reason = self.check_disqualification(text_lower, lowered=True)
+        if should_disqualify:
+            lead.status = LeadStatus.DISQUALIFIED
+            lead.qualification_notes = reason
+            lead.qualification_score = 0
+        return should_disqualify
+
     async def qualify_lead(self, lead_id: int) -> Lead:
         """Qualify a single lead and update its scores."""
         # Get lead with website analysis
@@ -201,44 +324,39 @@ class LeadQualifierService:
         if not lead:
             raise ValueError(f"Lead {lead_id} not found")
 
-        # Combine all text for analysis
-        full_text = " ".join(filter(None, [
-            lead.original_request or "",
-            lead.needs_description or "",
-            lead.business_description or "",
-        ]))
+        self.score_lead(lead)
 
-        # Check for disqualification
-        should_disqualify, reason = self.check_disqualification(full_text)
-        if should_disqualify:
-            lead.status = LeadStatus.DISQUALIFIED
-            lead.qualification_notes = reason
-            lead.qualification_score = 0
-            await self.db.commit()
-            return lead
+        await self.db.commit()
+        await self.db.refresh(lead)
+
+        return lead
+
+    def score_lead(self, lead: Lead):
+        """Score a lead by the rules and update its status; makes no queries."""
+        # Disqualification is the cheapest check and makes the rest moot
+        text_lower = self.lead_text(lead)
+        if self.apply_disqualification(lead, text_lower):
+            return
 
         # Detect industry
-        industry = self.detect_industry(full_text)
+        industry = self.detect_industry(text_lower, lowered=True)
         if industry and not lead.industry:
             lead.industry = industry
 
         # Estimate budget
-        budget_level, budget_score = self.estimate_budget_level(full_text)
+        budget_level, budget_score = self.estimate_budget_level(text_lower, lowered=True)
         lead.budget_score = budget_score
 
         # Estimate urgency
-        urgency_level, urgency_score = self.estimate_urgency_level(full_text)
+        urgency_level, urgency_score = self.estimate_urgency_level(text_lower, lowered=True)
         lead.urgency_score = urgency_score
         if not lead.urgency:
             lead.urgency = urgency_level
 
-        # Get website analysis if available
+        # Website analysis is eager-loaded with the lead
         website_score = None
         if lead.website:
-            wa_result = await self.db.execute(
-                select(WebsiteAnalysis).where(WebsiteAnalysis.lead_id == lead_id)
-            )
-            website_analysis = wa_result.scalar_one_or_none()
+            website_analysis = lead.website_analysis
             if website_analysis:
                 website_score = website_analysis.overall_score
 
@@ -278,26 +396,8 @@ class LeadQualifierService:
             notes.append(f"Качество сайта: {website_score:.0f}")
         lead.qualification_notes = "\n".join(notes)
 
-        await self.db.commit()
-        await self.db.refresh(lead)
-
-        return lead
-
-    async def qualify_lead_with_ai(self, lead_id: int) -> Lead:
-        """Qualify lead using AI for more nuanced analysis."""
-        if not self.openai_client or not settings.openai_api_key:
-            # Fallback to rule-based qualification
-            return await self.qualify_lead(lead_id)
-
-        # Get lead
-        result = await self.db.execute(
-            select(Lead).where(Lead.id == lead_id)
-        )
-        lead = result.scalar_one_or_none()
-
-        if not lead:
-            raise ValueError(f"Lead {lead_id} not found")
-
+    async def request_ai_qualification(self, lead: Lead) -> dict:
+        """Ask the AI model to assess a lead and return its parsed verdict."""
         # Prepare context for AI
         context = {
             "name": lead.name,
@@ -313,85 +413,89 @@ class LeadQualifierService:
             "has_website": bool(lead.website),
         }
 
-        prompt = f"""Проанализируй потенциального клиента для веб-студии и оцени его по следующим критериям.
-
-Данные о лиде:
+        prompt = f"""Данные о лиде:
 {json.dumps(context, ensure_ascii=False, indent=2)}
+"""
 
-Ответь в формате JSON:
-{{
-    "industry": "отрасль бизнеса",
-    "budget_score": 0-100,
-    "urgency_score": 0-100,
-    "fit_score": 0-100,
-    "is_spam": true/false,
-    "spam_reason": "причина если спам",
-    "project_type": "тип проекта (лендинг, корпоративный сайт, интернет-магазин, etc)",
-    "estimated_budget_range": "примерный диапазон бюджета",
-    "key_needs": ["потребность1", "потребность2"],
-    "notes": "краткие заметки о лиде"
-}}
+        # The same lead data gets the same verdict, so repeat prompts are served from cache
+        content = await cached_completion(
+            self.openai_client,
+            model=settings.openai_model,
+            messages=[
+                {"role": "system", "content": self.AI_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=500,
+        )
 
-Оценивай строго:
-- budget_score: 0-30 для маленьких бюджетов, 30-60 для средних, 60-100 для больших
-- urgency_score: выше если есть срочность
-- fit_score: насколько этот лид подходит как клиент для веб-студии
-"""
+        return parse_json_reply(content)
 
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {"role": "system", "content": "Ты - эксперт по квалификации лидов для веб-студии. Отвечай только валидным JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500,
-            )
+    def apply_ai_qualification(self, lead: Lead, ai_result: dict):
+        """Update lead scores and status from an AI verdict."""
+        # Check for spam
+        if ai_result.get("is_spam"):
+            lead.status = LeadStatus.SPAM
+            lead.qualification_notes = ai_result.get("spam_reason", "AI detected as spam")
+            lead.qualification_score = 0
+            return
+
+        # Update lead with AI analysis
+        lead.industry = ai_result.get("industry")
+        lead.budget_score = ai_result.get("budget_score", 50)
+        lead.urgency_score = ai_result.get("urgency_score", 50)
+        lead.fit_score = ai_result.get("fit_score", 50)
+
+        # Calculate overall score
+        lead.qualification_score = (
+            lead.budget_score * 0.3 +
+            lead.urgency_score * 0.2 +
+            lead.fit_score * 0.5
+        )
 
-            ai_result = json.loads(response.choices[0].message.content)
-
-            # Check for spam
-            if ai_result.get("is_spam"):
-                lead.status = LeadStatus.SPAM
-                lead.qualification_notes = ai_result.get("spam_reason", "AI detected as spam")
-                lead.qualification_score = 0
-                await self.db.commit()
-                return lead
-
-            # Update lead with AI analysis
-            lead.industry = ai_result.get("industry")
-            lead.budget_score = ai_result.get("budget_score", 50)
-            lead.urgency_score = ai_result.get("urgency_score", 50)
-            lead.fit_score = ai_result.get("fit_score", 50)
-
-            # Calculate overall score
-            lead.qualification_score = (
-                lead.budget_score * 0.3 +
-                lead.urgency_score * 0.2 +
-                lead.fit_score * 0.5
-            )
+        # Update status and priority
+        if lead.qualification_score >= 70:
+            lead.status = LeadStatus.QUALIFIED
+            lead.priority = 2
+        elif lead.qualification_score >= 50:
+            lead.status = LeadStatus.QUALIFIED
+            lead.priority = 1
+        else:
+            lead.status = LeadStatus.NEW
+            lead.priority = 0
 
-            # Update status and priority
-            if lead.qualification_score >= 70:
-                lead.status = LeadStatus.QUALIFIED
-                lead.priority = 2
-            elif lead.qualification_score >= 50:
-                lead.status = LeadStatus.QUALIFIED
-                lead.priority = 1
-            else:
-                lead.status = LeadStatus.NEW
-                lead.priority = 0
+        # Store AI analysis
+        lead.ai_analysis = ai_result
+        lead.qualification_notes = ai_result.get("notes", "")
 
-            # Store AI analysis
-            lead.ai_analysis = ai_result
-            lead.qualification_notes = ai_result.get("notes", "")
+    async def qualify_lead_with_ai(self, lead_id: int) -> Lead:
+        """Qualify lead using AI for more nuanced analysis."""
+        if not self.openai_client:
+            # Fallback to rule-based qualification
+            return await self.qualify_lead(lead_id)
 
+        # Get lead
+        result = await self.db.execute(
+            select(Lead).where(Lead.id == lead_id)
+        )
+        lead = result.scalar_one_or_none()
+
+        if not lead:
+            raise ValueError(f"Lead {lead_id} not found")
+
+        # No AI call for leads the rules already rule out
+        if self.apply_disqualification(lead, self.lead_text(lead)):
+            await self.db.commit()
+            return lead
+
+        try:
+            ai_result = await self.request_ai_qualification(lead)
+            self.apply_ai_qualification(lead, ai_result)
             await self.db.commit()
             await self.db.refresh(lead)
 
         except Exception as e:
-            print(f"AI qualification failed: {e}")
+            logger.warning("AI qualification failed: %s", e)
             # Fallback to rule-based
             return await self.qualify_lead(lead_id)
 
@@ -411,33 +515,59 @@ class LeadQualifierService:
             "errors": [],
         }
 
+        # Disqualified leads need no scoring and no AI call
+        remaining = []
         for lead in leads:
+            if self.apply_disqualification(lead, self.lead_text(lead)):
+                results["disqualified"] += 1
+            else:
+                remaining.append(lead)
+        leads = remaining
+
+        # AI calls are network-bound, so run them concurrently up front;
+        # the session only handles one query at a time, so writes stay sequential
+        ai_results = [None] * len(leads)
+        if use_ai and self.openai_client:
+            semaphore = asyncio.Semaphore(settings.analyze_concurrency)
+
+            async def request(lead: Lead) -> dict:
+                async with semaphore:
+                    return await self.request_ai_qualification(lead)
+
+            ai_results = await asyncio.gather(
+                *(request(lead) for lead in leads),
+                return_exceptions=True,
+            )
+
+        # The leads and their website analyses are already loaded, so
+        # scoring makes no queries; everything is saved in one commit
+        for lead, ai_result in zip(leads, ai_results):
             try:
-                if use_ai:
-                    qualified_lead = await self.qualify_lead_with_ai(lead.id)
+                if isinstance(ai_result, dict):
+                    self.apply_ai_qualification(lead, ai_result)
                 else:
-                    qualified_lead = await self.qualify_lead(lead.id)
+                    if isinstance(ai_result, Exception):
+                        logger.warning("AI qualification failed: %s", ai_result)
+                    self.score_lead(lead)
 
-                if qualified_lead.status == LeadStatus.QUALIFIED:
+                if lead.status == LeadStatus.QUALIFIED:
                     results["qualified"] += 1
-                elif qualified_lead.status == LeadStatus.DISQUALIFIED:
+                elif lead.status == LeadStatus.DISQUALIFIED:
                     results["disqualified"] += 1
-                elif qualified_lead.status == LeadStatus.SPAM:
+                elif lead.status == LeadStatus.SPAM:
                     results["spam"] += 1
 
             except Exception as e:
                 results["errors"].append(f"Lead {lead.id}: {str(e)}")
 
+        await self.db.commit()
         return results
 
     async def get_hot_leads(self, limit: int = 20) -> list[Lead]:
         """Get top qualified leads."""
         result = await self.db.execute(
             select(Lead)
-            .where(
-                Lead.status == LeadStatus.QUALIFIED,
-                Lead.qualification_score >= 60
-            )
+            .where(HOT_LEADS_FILTER)
             .order_by(Lead.qualification_score.desc(), Lead.priority.desc())
             .limit(limit)
         )
@@ -1,6 +1,7 @@
 """Proposal generator service - generates personalized proposals for leads."""
 
 import json
+import logging
 from datetime import datetime
 from typing import Optional
 
@@ -9,6 +10,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Lead, Proposal, ProposalStatus, ProposalChannel, WebsiteAnalysis
 from app.config import settings
+from app.services.ai_client import create_completion, get_openai_client, parse_json_reply
+
+logger = logging.getLogger(__name__)
 
 
 class ProposalGeneratorService:
@@ -42,6 +46,27 @@ class ProposalGeneratorService:
 {value_proposition}
 
 {call_to_action}
+"""
+
+    # Fixed instructions shared by every request, sent first so the API can
+    # cache them as a prompt prefix
+    AI_SYSTEM_PROMPT = """Ты - опытный менеджер по продажам веб-студии. Создаёшь персонализированные, убедительные предложения.
+
+Создай персонализированное предложение для потенциального клиента веб-студии.
+
+Общие требования:
+- Обращайся на "вы"
+- Упомяни конкретные проблемы их сайта если есть
+- Предложи конкретное решение
+- Добавь призыв к действию
+
+Ответь в формате JSON:
+{
+    "subject": "тема письма (только для email)",
+    "content": "текст предложения",
+    "key_points": ["ключевой момент 1", "ключевой момент 2"],
+    "call_to_action": "призыв к действию"
+}
 """
 
     # Portfolio examples by industry
@@ -125,7 +150,7 @@ class ProposalGeneratorService:
     def __init__(self, db: AsyncSession, openai_client=None):
         """Initialize the proposal generator service."""
         self.db = db
-        self.openai_client = openai_client
+        self.openai_client = openai_client or get_openai_client()
         self.sender_name = "Ваш веб-разработчик"
         self.sender_company = ""
         self.sender_contacts = ""
@@ -261,13 +286,10 @@ class ProposalGeneratorService:
         if not lead:
             raise ValueError(f"Lead {lead_id} not found")
 
-        # Get website analysis if available
+        # Website analysis is eager-loaded with the lead
         website_analysis = None
         if include_website_analysis and lead.website:
-            wa_result = await self.db.execute(
-                select(WebsiteAnalysis).where(WebsiteAnalysis.lead_id == lead_id)
-            )
-            website_analysis = wa_result.scalar_one_or_none()
+            website_analysis = lead.website_analysis
 
         # Detect project type and source
         project_type = self.detect_project_type(lead)
@@ -363,7 +385,7 @@ class ProposalGeneratorService:
         custom_instructions: Optional[str] = None,
     ) -> Proposal:
         """Generate a proposal using AI for more personalized content."""
-        if not self.openai_client or not settings.openai_api_key:
+        if not self.openai_client:
             # Fallback to template-based generation
             return await self.generate_proposal(lead_id, channel, tone)
 
@@ -376,13 +398,10 @@ class ProposalGeneratorService:
         if not lead:
             raise ValueError(f"Lead {lead_id} not found")
 
-        # Get website analysis
+        # Website analysis is eager-loaded with the lead
         website_analysis = None
         if lead.website:
-            wa_result = await self.db.execute(
-                select(WebsiteAnalysis).where(WebsiteAnalysis.lead_id == lead_id)
-            )
-            website_analysis = wa_result.scalar_one_or_none()
+            website_analysis = lead.website_analysis
 
         # Prepare context for AI
         context = {
@@ -409,41 +428,28 @@ class ProposalGeneratorService:
             ProposalChannel.TELEGRAM: "Это сообщение в Telegram. Короче, без лишних формальностей, с эмодзи если уместно.",
         }
 
-        prompt = f"""Создай персонализированное предложение для потенциального клиента веб-студии.
-
-Информация о клиенте:
+        prompt = f"""Информация о клиенте:
 {json.dumps(context, ensure_ascii=False, indent=2)}
 
 Требования:
 - {tone_instructions.get(tone, tone_instructions['professional'])}
 - {channel_instructions.get(channel, '')}
-- Обращайся на "вы"
-- Упомяни конкретные проблемы их сайта если есть
-- Предложи конкретное решение
-- Добавь призыв к действию
 {f'- Дополнительные инструкции: {custom_instructions}' if custom_instructions else ''}
-
-Ответь в формате JSON:
-{{
-    "subject": "тема письма (только для email)",
-    "content": "текст предложения",
-    "key_points": ["ключевой момент 1", "ключевой момент 2"],
-    "call_to_action": "призыв к действию"
-}}
 """
 
         try:
-            response = await self.openai_client.chat.completions.create(
+            content = await create_completion(
+                self.openai_client,
                 model=settings.openai_model,
                 messages=[
-                    {"role": "system", "content": "Ты - опытный менеджер по продажам веб-студии. Создаёшь персонализированные, убедительные предложения."},
+                    {"role": "system", "content": self.AI_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
                 max_tokens=1000,
             )
 
-            ai_result = json.loads(response.choices[0].message.content)
+            ai_result = parse_json_reply(content)
 
             proposal = Proposal(
                 lead_id=lead_id,
@@ -466,7 +472,7 @@ class ProposalGeneratorService:
             return proposal
 
         except Exception as e:
-            print(f"AI proposal generation failed: {e}")
+            logger.warning("AI proposal generation failed: %s", e)
             # Fallback to template-based
             return await self.generate_proposal(lead_id, channel, tone)
 
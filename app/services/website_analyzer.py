@@ -1,5 +1,6 @@
 """Website analyzer service - analyzes websites for quality and issues."""
 
+import asyncio
 import re
 import time
 from datetime import datetime
@@ -14,6 +15,32 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Lead, WebsiteAnalysis
 from app.config import settings
 
+# One session for all analyzers, so its connector's pool and DNS cache are reused
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get or create the shared HTTP session for website checks."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                # Analyzed sites are mostly small; don't open many sockets to one
+                limit_per_host=4,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+        )
+    return _http_session
+
+
+async def close_http_session():
+    """Close the shared HTTP session."""
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+
 
 class WebsiteAnalyzerService:
     """Service for analyzing websites and finding improvement opportunities."""
@@ -69,39 +96,35 @@ class WebsiteAnalyzerService:
 
     # Technology detection patterns
     TECH_PATTERNS = {
-        "WordPress": [r"wp-content", r"wp-includes", r"wordpress"],
-        "Joomla": [r"com_content", r"joomla"],
-        "Drupal": [r"drupal", r"sites/default"],
-        "1C-Bitrix": [r"bitrix", r"/bitrix/"],
-        "Tilda": [r"tilda", r"tildacdn"],
-        "Wix": [r"wixsite", r"wix.com"],
-        "Shopify": [r"shopify", r"cdn.shopify"],
-        "OpenCart": [r"opencart", r"route=common"],
-        "ModX": [r"modx"],
-        "React": [r"react", r"_next", r"__NEXT_DATA__"],
-        "Vue.js": [r"vue", r"__VUE__"],
-        "Angular": [r"ng-version", r"angular"],
-        "Bootstrap": [r"bootstrap"],
-        "jQuery": [r"jquery"],
+        "WordPress": re.compile(r"wp-content|wp-includes|wordpress", re.IGNORECASE),
+        "Joomla": re.compile(r"com_content|joomla", re.IGNORECASE),
+        "Drupal": re.compile(r"drupal|sites/default", re.IGNORECASE),
+        "1C-Bitrix": re.compile(r"bitrix|/bitrix/", re.IGNORECASE),
+        "Tilda": re.compile(r"tilda|tildacdn", re.IGNORECASE),
+        "Wix": re.compile(r"wixsite|wix.com", re.IGNORECASE),
+        "Shopify": re.compile(r"shopify|cdn.shopify", re.IGNORECASE),
+        "OpenCart": re.compile(r"opencart|route=common", re.IGNORECASE),
+        "ModX": re.compile(r"modx", re.IGNORECASE),
+        "React": re.compile(r"react|_next|__NEXT_DATA__", re.IGNORECASE),
+        "Vue.js": re.compile(r"vue|__VUE__", re.IGNORECASE),
+        "Angular": re.compile(r"ng-version|angular", re.IGNORECASE),
+        "Bootstrap": re.compile(r"bootstrap", re.IGNORECASE),
+        "jQuery": re.compile(r"jquery", re.IGNORECASE),
     }
 
+    # Class names and markers of responsive layouts
+    RESPONSIVE_PATTERN = re.compile(r"responsive|mobile|col-\d+|col-sm-|col-md-|col-lg-", re.IGNORECASE)
+
+    # Links to social networks
+    SOCIAL_PATTERN = re.compile(
+        r"facebook\.com|vk\.com|instagram\.com|twitter\.com|linkedin\.com"
+        r"|youtube\.com|t\.me|telegram\.me",
+        re.IGNORECASE,
+    )
+
     def __init__(self, db: AsyncSession):
         """Initialize the website analyzer service."""
         self.db = db
-        self._session: Optional[aiohttp.ClientSession] = None
-
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30)
-            )
-        return self._session
-
-    async def close(self):
-        """Close HTTP session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
 
     def normalize_url(self, url: str) -> str:
         """Normalize URL to include protocol."""
@@ -126,7 +149,7 @@ class WebsiteAnalyzerService:
         }
 
         try:
-            session = await self.get_session()
+            session = get_http_session()
             start_time = time.time()
 
             async with session.get(url, allow_redirects=True) as response:
@@ -149,16 +172,7 @@ class WebsiteAnalyzerService:
 
     def detect_technologies(self, html: str) -> list[str]:
         """Detect technologies used on the website."""
-        technologies = []
-        html_lower = html.lower()
-
-        for tech, patterns in self.TECH_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, html_lower, re.IGNORECASE):
-                    technologies.append(tech)
-                    break
-
-        return list(set(technologies))
+        return [tech for tech, pattern in self.TECH_PATTERNS.items() if pattern.search(html)]
 
     def detect_cms(self, html: str, technologies: list[str]) -> Optional[str]:
         """Detect the CMS used."""
@@ -182,20 +196,7 @@ class WebsiteAnalyzerService:
             return True
 
         # Check for responsive classes
-        responsive_patterns = [
-            r"responsive",
-            r"mobile",
-            r"col-\d+",
-            r"col-sm-",
-            r"col-md-",
-            r"col-lg-",
-        ]
-
-        for pattern in responsive_patterns:
-            if re.search(pattern, html, re.IGNORECASE):
-                return True
-
-        return False
+        return self.RESPONSIVE_PATTERN.search(html) is not None
 
     def extract_meta_info(self, html: str) -> dict:
         """Extract meta information from HTML."""
@@ -229,22 +230,7 @@ class WebsiteAnalyzerService:
 
     def check_social_links(self, html: str) -> bool:
         """Check if website has social media links."""
-        social_patterns = [
-            r"facebook\.com",
-            r"vk\.com",
-            r"instagram\.com",
-            r"twitter\.com",
-            r"linkedin\.com",
-            r"youtube\.com",
-            r"t\.me",
-            r"telegram\.me",
-        ]
-
-        for pattern in social_patterns:
-            if re.search(pattern, html, re.IGNORECASE):
-                return True
-
-        return False
+        return self.SOCIAL_PATTERN.search(html) is not None
 
     def calculate_performance_score(self, load_time_ms: int) -> float:
         """Calculate performance score based on load time."""
@@ -409,6 +395,32 @@ class WebsiteAnalyzerService:
             "improvement_suggestions": suggestions,
         }
 
+    def build_analysis(self, lead_id: int, url: str, analysis_result: dict) -> WebsiteAnalysis:
+        """Create a WebsiteAnalysis record from analysis results."""
+        return WebsiteAnalysis(
+            lead_id=lead_id,
+            url=url,
+            is_accessible=analysis_result.get("is_accessible", False),
+            status_code=analysis_result.get("status_code"),
+            load_time_ms=analysis_result.get("load_time_ms"),
+            has_ssl=analysis_result.get("has_ssl"),
+            is_mobile_friendly=analysis_result.get("is_mobile_friendly"),
+            has_responsive_design=analysis_result.get("has_responsive_design"),
+            performance_score=analysis_result.get("performance_score"),
+            seo_score=analysis_result.get("seo_score"),
+            design_score=analysis_result.get("design_score"),
+            overall_score=analysis_result.get("overall_score"),
+            title=analysis_result.get("title"),
+            meta_description=analysis_result.get("meta_description"),
+            has_contact_form=analysis_result.get("has_contact_form"),
+            has_social_links=analysis_result.get("has_social_links"),
+            technologies=analysis_result.get("technologies"),
+            cms_detected=analysis_result.get("cms_detected"),
+            issues=analysis_result.get("issues"),
+            improvement_suggestions=analysis_result.get("improvement_suggestions"),
+            raw_analysis=analysis_result,
+        )
+
     async def analyze_lead_website(self, lead_id: int) -> Optional[WebsiteAnalysis]:
         """Analyze website for a specific lead and save results."""
         # Get lead
@@ -420,11 +432,8 @@ class WebsiteAnalyzerService:
         if not lead or not lead.website:
             return None
 
-        # Check if analysis already exists
-        result = await self.db.execute(
-            select(WebsiteAnalysis).where(WebsiteAnalysis.lead_id == lead_id)
-        )
-        existing = result.scalar_one_or_none()
+        # An existing analysis is eager-loaded with the lead
+        existing = lead.website_analysis
 
         # Perform analysis
         analysis_result = await self.analyze_website(lead.website)
@@ -438,29 +447,7 @@ class WebsiteAnalyzerService:
             analysis = existing
         else:
             # Create new analysis
-            analysis = WebsiteAnalysis(
-                lead_id=lead_id,
-                url=lead.website,
-                is_accessible=analysis_result.get("is_accessible", False),
-                status_code=analysis_result.get("status_code"),
-                load_time_ms=analysis_result.get("load_time_ms"),
-                has_ssl=analysis_result.get("has_ssl"),
-                is_mobile_friendly=analysis_result.get("is_mobile_friendly"),
-                has_responsive_design=analysis_result.get("has_responsive_design"),
-                performance_score=analysis_result.get("performance_score"),
-                seo_score=analysis_result.get("seo_score"),
-                design_score=analysis_result.get("design_score"),
-                overall_score=analysis_result.get("overall_score"),
-                title=analysis_result.get("title"),
-                meta_description=analysis_result.get("meta_description"),
-                has_contact_form=analysis_result.get("has_contact_form"),
-                has_social_links=analysis_result.get("has_social_links"),
-                technologies=analysis_result.get("technologies"),
-                cms_detected=analysis_result.get("cms_detected"),
-                issues=analysis_result.get("issues"),
-                improvement_suggestions=analysis_result.get("improvement_suggestions"),
-                raw_analysis=analysis_result,
-            )
+            analysis = self.build_analysis(lead_id, lead.website, analysis_result)
             self.db.add(analysis)
 
         await self.db.commit()
@@ -489,15 +476,27 @@ class WebsiteAnalyzerService:
             "errors": [],
         }
 
-        for lead in leads:
-            try:
-                analysis = await self.analyze_lead_website(lead.id)
-                if analysis:
-                    results["analyzed"] += 1
-                else:
-                    results["failed"] += 1
-            except Exception as e:
+        # Fetch sites concurrently; the session only handles one query at a time,
+        # so records are written afterwards
+        semaphore = asyncio.Semaphore(settings.analyze_concurrency)
+
+        async def analyze(lead: Lead) -> dict:
+            async with semaphore:
+                return await self.analyze_website(lead.website)
+
+        analysis_results = await asyncio.gather(
+            *(analyze(lead) for lead in leads),
+            return_exceptions=True,
+        )
+
+        for lead, analysis_result in zip(leads, analysis_results):
+            if isinstance(analysis_result, Exception):
                 results["failed"] += 1
-                results["errors"].append(f"Lead {lead.id}: {str(e)}")
+                results["errors"].append(f"Lead {lead.id}: {str(analysis_result)}")
+                continue
+            self.db.add(self.build_analysis(lead.id, lead.website, analysis_result))
+            results["analyzed"] += 1
+
+        await self.db.commit()
 
         return results
@@ -3,11 +3,13 @@
 import asyncio
 from typing import AsyncGenerator
 
+import orjson
 import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
-from app.database import Base
+from app.cache import response_cache
+from app.database import Base, json_serializer
 from app.models import Lead, Source, Proposal, WebsiteAnalysis, LeadStatus, SourceType
 
 
@@ -23,10 +25,23 @@ def event_loop():
     loop.close()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def clear_response_cache():
+    """Keep cached endpoint responses from leaking between tests."""
+    await response_cache.clear()
+    yield
+    await response_cache.clear()
+
+
 @pytest_asyncio.fixture
 async def db_engine():
     """Create test database engine."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        echo=False,
+        json_serializer=json_serializer,
+        json_deserializer=orjson.loads,
+    )
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -1,13 +1,19 @@
 """Tests for API endpoints."""
 
+from types import SimpleNamespace
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
+from app.cache import response_cache
 from app.database import get_db
-from app.models import Lead, Source, LeadStatus, SourceType
+from app.models import Lead, Proposal, Source, LeadStatus, SourceType, WebsiteAnalysis
+from app.services import ai_client
+from app.services.proposal_generator import ProposalGeneratorService
 
 
 class TestLeadsAPI:
@@ -54,6 +60,21 @@ class TestLeadsAPI:
         assert data["email"] == "test@example.com"
         assert data["id"] is not None
 
+    @pytest.mark.asyncio
+    async def test_create_lead_duplicate_source_url(self, client: AsyncClient, sample_source: Source):
+        """Test that a lead with an existing source URL is rejected."""
+        lead_data = {
+            "name": "Test Lead",
+            "source_id": sample_source.id,
+            "source_url": "https://t.me/test/1",
+        }
+
+        response = await client.post("/api/leads", json=lead_data)
+        assert response.status_code == 201
+
+        response = await client.post("/api/leads", json=lead_data)
+        assert response.status_code == 409
+
     @pytest.mark.asyncio
     async def test_get_lead(self, client: AsyncClient, sample_lead: Lead):
         """Test getting a single lead."""
@@ -63,6 +84,26 @@ class TestLeadsAPI:
         assert data["name"] == sample_lead.name
         assert data["email"] == sample_lead.email
 
+    @pytest.mark.asyncio
+    async def test_get_lead_not_modified(self, client: AsyncClient, sample_lead: Lead):
+        """Test conditional GET with If-None-Match."""
+        response = await client.get(f"/api/leads/{sample_lead.id}")
+        etag = response.headers["etag"]
+
+        response = await client.get(
+            f"/api/leads/{sample_lead.id}",
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = await client.get(
+            f"/api/leads/{sample_lead.id}",
+            headers={"If-None-Match": 'W/"stale"'},
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == sample_lead.name
+
     @pytest.mark.asyncio
     async def test_get_lead_not_found(self, client: AsyncClient):
         """Test getting non-existent lead."""
@@ -82,6 +123,12 @@ class TestLeadsAPI:
         data = response.json()
         assert data["status"] == "contacted"
 
+    @pytest.mark.asyncio
+    async def test_update_lead_not_found(self, client: AsyncClient):
+        """Test updating non-existent lead."""
+        response = await client.patch("/api/leads/99999", json={"status": "contacted"})
+        assert response.status_code == 404
+
     @pytest.mark.asyncio
     async def test_delete_lead(self, client: AsyncClient, sample_lead: Lead):
         """Test deleting a lead."""
@@ -92,6 +139,26 @@ class TestLeadsAPI:
         response = await client.get(f"/api/leads/{sample_lead.id}")
         assert response.status_code == 404
 
+    @pytest.mark.asyncio
+    async def test_delete_lead_removes_dependents(
+        self, client: AsyncClient, db_session: AsyncSession, sample_lead: Lead
+    ):
+        """Test that deleting a lead removes its analysis and proposals."""
+        db_session.add(WebsiteAnalysis(lead_id=sample_lead.id, url=sample_lead.website, overall_score=11.0))
+        db_session.add(Proposal(lead_id=sample_lead.id, content="Предложение"))
+        await db_session.commit()
+
+        response = await client.delete(f"/api/leads/{sample_lead.id}")
+        assert response.status_code == 204
+
+        assert await db_session.scalar(select(func.count(WebsiteAnalysis.id))) == 0
+        assert await db_session.scalar(select(func.count(Proposal.id))) == 0
+
+        # A new lead may reuse the id and must not inherit the old analysis
+        response = await client.post("/api/leads", json={"name": "New Lead"})
+        assert response.status_code == 201
+        assert response.json()["website_analysis"] is None
+
     @pytest.mark.asyncio
     async def test_get_leads_stats(self, client: AsyncClient, sample_lead: Lead):
         """Test getting leads statistics."""
@@ -101,6 +168,25 @@ class TestLeadsAPI:
         assert "total" in data
         assert "by_status" in data
         assert data["total"] >= 1
+        assert data["by_status"]["new"] == 1
+        assert data["by_status"]["won"] == 0
+        assert data["with_contact"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_leads_stats_cached(self, client: AsyncClient, db_session: AsyncSession):
+        """Test that lead statistics are served from the response cache."""
+        response = await client.get("/api/leads/stats")
+        assert response.json()["total"] == 0
+
+        db_session.add(Lead(name="Cached Lead"))
+        await db_session.commit()
+
+        response = await client.get("/api/leads/stats")
+        assert response.json()["total"] == 0
+
+        await response_cache.clear()
+        response = await client.get("/api/leads/stats")
+        assert response.json()["total"] == 1
 
     @pytest.mark.asyncio
     async def test_qualify_lead(self, client: AsyncClient, sample_lead: Lead):
@@ -118,6 +204,59 @@ class TestLeadsAPI:
         data = response.json()
         assert all(item["status"] == "new" for item in data["items"])
 
+    @pytest.mark.asyncio
+    async def test_list_leads_total_respects_filters(self, client: AsyncClient, sample_lead: Lead):
+        """Test that the total count applies the same filters as the page."""
+        response = await client.get("/api/leads?search=магазин")
+        assert response.status_code == 200
+        assert response.json()["total"] == 1
+
+        response = await client.get("/api/leads?status=won")
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_list_leads_page_count(self, client: AsyncClient, db_session: AsyncSession):
+        """Test that the page count is rounded up from the total."""
+        db_session.add_all([Lead(name=f"Lead {i}") for i in range(81)])
+        await db_session.commit()
+
+        response = await client.get("/api/leads?per_page=20")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 81
+        assert data["pages"] == 5
+
+    @pytest.mark.asyncio
+    async def test_list_leads_cursor_pagination(self, client: AsyncClient, db_session: AsyncSession):
+        """Test walking the lead list with keyset cursors."""
+        scores = [90.0, None, 50.0, 50.0, None, 70.0, 50.0]
+        db_session.add_all([
+            Lead(name=f"Lead {i}", qualification_score=score)
+            for i, score in enumerate(scores)
+        ])
+        await db_session.commit()
+
+        response = await client.get("/api/leads?per_page=7")
+        expected = [item["id"] for item in response.json()["items"]]
+
+        seen = []
+        response = await client.get("/api/leads?per_page=3")
+        while True:
+            data = response.json()
+            seen.extend(item["id"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            response = await client.get(f"/api/leads?per_page=3&cursor={data['next_cursor']}")
+
+        assert seen == expected
+
+    @pytest.mark.asyncio
+    async def test_list_leads_invalid_cursor(self, client: AsyncClient):
+        """Test that a malformed cursor is rejected."""
+        response = await client.get("/api/leads?cursor=not-a-cursor")
+        assert response.status_code == 400
+
 
 class TestSourcesAPI:
     """Tests for sources API endpoints."""
@@ -170,6 +309,22 @@ class TestSourcesAPI:
         data = response.json()
         assert data["is_active"] != initial_status
 
+    @pytest.mark.asyncio
+    async def test_delete_source(
+        self, client: AsyncClient, db_session: AsyncSession, sample_lead: Lead
+    ):
+        """Test deleting a source detaches its leads."""
+        source_id = sample_lead.source_id
+
+        response = await client.delete(f"/api/sources/{source_id}")
+        assert response.status_code == 204
+
+        response = await client.delete(f"/api/sources/{source_id}")
+        assert response.status_code == 404
+
+        await db_session.refresh(sample_lead)
+        assert sample_lead.source_id is None
+
 
 class TestProposalsAPI:
     """Tests for proposals API endpoints."""
@@ -206,6 +361,32 @@ class TestProposalsAPI:
         assert data["content"] is not None
         assert len(data["content"]) > 0
 
+    @pytest.mark.asyncio
+    async def test_ai_proposal_uses_rate_limiter(
+        self, db_session: AsyncSession, sample_lead: Lead, monkeypatch
+    ):
+        """Test that AI proposals are paced by the shared AI rate limiter."""
+        acquired = []
+
+        class Limiter:
+            async def acquire(self):
+                acquired.append(True)
+
+        async def create(**params):
+            assert acquired, "API called before the limiter was acquired"
+            content = '{"subject": "Сайт", "content": "Предложение", "key_points": []}'
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        monkeypatch.setattr(ai_client, "get_rate_limiter", lambda: Limiter())
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        generator = ProposalGeneratorService(db_session, openai_client=client)
+
+        proposal = await generator.generate_proposal_with_ai(sample_lead.id)
+
+        assert acquired == [True]
+        assert proposal.personalization_data["ai_generated"] is True
+        assert proposal.content == "Предложение"
+
     @pytest.mark.asyncio
     async def test_list_channels(self, client: AsyncClient):
         """Test listing proposal channels."""
@@ -279,3 +460,12 @@ class TestHealthCheck:
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
+
+    @pytest.mark.asyncio
+    async def test_index(self, client: AsyncClient):
+        """Test serving the dashboard page."""
+        first = await client.get("/")
+        second = await client.get("/")
+        assert first.status_code == 200
+        assert first.headers["content-type"].startswith("text/html")
+        assert second.content == first.content
@@ -0,0 +1,174 @@
+"""Tests for lead finder service."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Lead, LeadStatus, Source, SourceType
+from app.parsers.base import BaseParser, ParsedLead
+from app.services.lead_finder import LeadFinderService
+
+
+class StaticParser(BaseParser):
+    """Parser that yields a fixed list of leads."""
+
+    def __init__(self, leads: list[ParsedLead]):
+        super().__init__()
+        self.leads = leads
+
+    async def search(self, max_results=50):
+        for lead in self.leads[:max_results]:
+            yield lead
+
+    def get_source_name(self): return "static"
+    def get_source_type(self): return "static"
+
+
+class TestLeadFinderService:
+    """Tests for LeadFinderService."""
+
+    @pytest.mark.asyncio
+    async def test_search_source(
+        self, db_session: AsyncSession, sample_source: Source, sample_lead: Lead
+    ):
+        """Test storing parsed leads in batches and skipping duplicates."""
+        parser = StaticParser([
+            ParsedLead(name="One", source_url="https://example.com/1", original_request="Нужен сайт"),
+            ParsedLead(name="Two", source_url="https://example.com/2", original_request="Нужен сайт"),
+            ParsedLead(name="Repeat", source_url="https://example.com/1", original_request="Нужен сайт"),
+            ParsedLead(name="Known", source_url="https://example.com/3", original_request="Нужен сайт",
+                       email=sample_lead.email),
+            ParsedLead(name="Three", source_url="https://example.com/4", original_request="Нужен сайт"),
+        ])
+        finder = LeadFinderService(db_session)
+
+        leads = await finder.search_source(parser, sample_source, batch_size=2)
+        await db_session.commit()
+
+        assert [lead.name for lead in leads] == ["One", "Two", "Three"]
+        assert all(lead.id is not None for lead in leads)
+        assert all(lead.status == LeadStatus.NEW for lead in leads)
+        assert sample_source.total_leads_found == 3
+        assert sample_source.last_search_at is not None
+
+        total = await db_session.scalar(select(func.count(Lead.id)))
+        assert total == 4
+
+    @pytest.mark.asyncio
+    async def test_search_source_skips_conflicts(
+        self, db_session: AsyncSession, sample_source: Source, sample_lead: Lead, monkeypatch
+    ):
+        """Test that rows hitting the source URL unique index are skipped."""
+        finder = LeadFinderService(db_session)
+
+        async def no_duplicates(batch):
+            return set()
+
+        monkeypatch.setattr(finder, "find_existing_keys", no_duplicates)
+
+        sample_lead.source_url = "https://example.com/taken"
+        await db_session.commit()
+
+        parser = StaticParser([
+            ParsedLead(name="Taken", source_url="https://example.com/taken", original_request="Нужен сайт"),
+            ParsedLead(name="Fresh", source_url="https://example.com/fresh", original_request="Нужен сайт"),
+        ])
+
+        leads = await finder.search_source(parser, sample_source)
+        await db_session.commit()
+
+        assert [lead.name for lead in leads] == ["Fresh"]
+        assert sample_source.total_leads_found == 1
+
+    @pytest.mark.asyncio
+    async def test_search_source_stores_while_fetching(
+        self, db_session: AsyncSession, sample_source: Source
+    ):
+        """Test that batches are stored while the parser fetches the next ones."""
+        finder = LeadFinderService(db_session)
+        stored_before_second = []
+
+        class PagedParser(StaticParser):
+            async def search(self, max_results=50):
+                yield ParsedLead(name="First", source_url="https://example.com/p1", original_request="Нужен сайт")
+                # The next page is still loading when the first batch is written
+                for _ in range(100):
+                    if sample_source.total_leads_found:
+                        break
+                    await asyncio.sleep(0.01)
+                stored_before_second.append(sample_source.total_leads_found)
+                yield ParsedLead(name="Second", source_url="https://example.com/p2", original_request="Нужен сайт")
+
+        leads = await finder.search_source(PagedParser([]), sample_source, batch_size=1)
+        await db_session.commit()
+
+        assert [lead.name for lead in leads] == ["First", "Second"]
+        assert stored_before_second == [1]
+
+    @pytest.mark.asyncio
+    async def test_search_all_sources(
+        self, db_session: AsyncSession, sample_source: Source, monkeypatch
+    ):
+        """Test that sources are fetched concurrently and one failure is reported."""
+        forum = Source(name="Forum", source_type=SourceType.FORUM, is_active=True)
+        db_session.add(forum)
+        await db_session.commit()
+
+        started = []
+
+        class SlowParser(StaticParser):
+            def __init__(self, keywords=None):
+                super().__init__([
+                    ParsedLead(name="Slow", source_url="https://example.com/slow", original_request="Нужен сайт"),
+                ])
+
+            async def search(self, max_results=50):
+                started.append("slow")
+                await asyncio.sleep(0.01)
+                # The other source has started while this one waits on the network
+                assert "failing" in started
+                async for lead in super().search(max_results):
+                    yield lead
+
+        class FailingParser(StaticParser):
+            def __init__(self, keywords=None):
+                super().__init__([])
+
+            async def search(self, max_results=50):
+                started.append("failing")
+                raise RuntimeError("site is down")
+                yield
+
+        monkeypatch.setattr(LeadFinderService, "PARSER_REGISTRY", {
+            SourceType.TELEGRAM_CHANNEL: SlowParser,
+            SourceType.FORUM: FailingParser,
+        })
+        finder = LeadFinderService(db_session)
+
+        results = await finder.search_all_sources()
+
+        assert results["by_source"] == {"Test Source": 1}
+        assert results["total_found"] == 1
+        assert results["errors"] == ["Error searching Forum: site is down"]
+
+    @pytest.mark.asyncio
+    async def test_get_or_create_source(self, db_session: AsyncSession, sample_source: Source):
+        """Test that sources are created once and reused within the service."""
+        finder = LeadFinderService(db_session)
+
+        existing = await finder.get_or_create_source(sample_source.name, sample_source.source_type)
+        created = await finder.get_or_create_source("Custom", SourceType.FORUM)
+        again = await finder.get_or_create_source("Custom", SourceType.FORUM)
+
+        assert existing is sample_source
+        assert created.id is not None
+        assert again is created
+
+        defaults = await finder._create_default_sources()
+        assert len(defaults) == 4
+        assert defaults == await LeadFinderService(db_session)._create_default_sources()
+
+        total = await db_session.scalar(select(func.count(Source.id)))
+        assert total == 6
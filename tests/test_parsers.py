@@ -1,7 +1,15 @@
 """Tests for parsers."""
 
+import asyncio
+
+import httpx
 import pytest
+from app.parsers import base
+from app.parsers.avito_parser import AvitoParser
 from app.parsers.base import BaseParser, ParsedLead
+from app.parsers.forum_parser import ForumParser
+from app.parsers.freelance_parser import FreelanceParser
+from app.parsers.telegram_parser import TelegramParser
 
 
 class TestBaseParser:
@@ -58,6 +66,45 @@ class TestBaseParser:
         # Test no telegram
         assert parser.extract_telegram("no telegram here") is None
 
+    def test_extract_contacts(self):
+        """Test extracting all contacts in one pass."""
+        class ConcreteParser(BaseParser):
+            async def search(self, max_results=50):
+                yield ParsedLead(name="test", source_url="test", original_request="test")
+            def get_source_name(self): return "test"
+            def get_source_type(self): return "test"
+
+        parser = ConcreteParser()
+
+        assert parser.extract_contacts(
+            "пишите на test@example.com или @tg_user1, сайт https://ex.com/page"
+        ) == {
+            "email": "test@example.com",
+            "phone": None,
+            "telegram": "tg_user1",
+            "website": "https://ex.com/page",
+            "budget": None,
+        }
+        assert parser.extract_contacts("канал https://t.me/webdev_chat")["telegram"] == "webdev_chat"
+        assert parser.extract_contacts("нет контактов") == {
+            "email": None, "phone": None, "telegram": None, "website": None, "budget": None,
+        }
+        assert parser.extract_contacts("Бюджет: 50 тыс, звоните +7 999 123 4567") == {
+            "email": None,
+            "phone": "+7 999 123 4567",
+            "telegram": None,
+            "website": None,
+            "budget": "Бюджет: 50 тыс",
+        }
+        # The budget group's case-insensitivity does not reach the contact groups
+        assert parser.extract_contacts("БЮДЖЕТ 80K, почта Info@Example.com") == {
+            "email": "Info@Example.com",
+            "phone": None,
+            "telegram": None,
+            "website": None,
+            "budget": "БЮДЖЕТ 80K",
+        }
+
     def test_extract_budget(self):
         """Test budget extraction."""
         class ConcreteParser(BaseParser):
@@ -71,6 +118,12 @@ class TestBaseParser:
         # Test budget mentions
         assert parser.extract_budget("бюджет: 100 тыс руб") is not None
         assert parser.extract_budget("50k budget") is not None
+        assert parser.extract_budget("Budget 50K") == "50K"
+        assert parser.extract_budget("Бюджет 50 тыс") == "Бюджет 50 тыс"
+
+        # "бюджет" alone is not an amount
+        assert parser.extract_budget("бюджет обсуждается") is None
+        assert parser.extract_budget("Бюджет: по договорённости") is None
 
     def test_contains_keyword(self):
         """Test keyword detection."""
@@ -103,6 +156,250 @@ class TestBaseParser:
         assert parser.estimate_urgency("в ближайшее время") == "high"
         assert parser.estimate_urgency("нужен сайт") == "medium"
 
+    @pytest.mark.asyncio
+    async def test_search_batches(self):
+        """Test grouping search results into batches."""
+        class ConcreteParser(BaseParser):
+            async def search(self, max_results=50):
+                for i in range(max_results):
+                    yield ParsedLead(name=f"test {i}", source_url=f"test/{i}", original_request="test")
+            def get_source_name(self): return "test"
+            def get_source_type(self): return "test"
+
+        parser = ConcreteParser()
+
+        batches = [batch async for batch in parser.search_batches(max_results=5, batch_size=2)]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert batches[-1][0].name == "test 4"
+
+    def test_node_text_separates_words(self):
+        """Test that text split across tags keeps its word boundaries."""
+        parser = AvitoParser()
+        tree = parser.parse_tree("<div>Нужен сайт<br>срочно, <b>пишите</b>\n  @x <span> </span></div>")
+
+        assert parser.node_text(tree.css_first("div")) == "Нужен сайт срочно, пишите @x"
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_retries_rate_limited(self, monkeypatch):
+        """Test that a 429 response is retried after its Retry-After delay."""
+        statuses = iter([429, 200])
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(next(statuses), headers={"Retry-After": "0"}, text="ok")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(base, "get_http_client", lambda: client)
+        parser = AvitoParser()
+
+        assert await parser.fetch_page("https://example.com/") == "ok"
+        assert len(requests) == 2
+        assert requests[0].headers["User-Agent"] == parser.headers["User-Agent"]
+
+
+class TestAvitoParser:
+    """Tests for AvitoParser."""
+
+    SEARCH_HTML = """
+    <html><body>
+      <div data-marker="item">
+        <a data-marker="item-title" href="/moskva/uslugi/1?context=abc" title="Ищу исполнителя: нужен сайт">x</a>
+        <meta itemprop="price" content="50000">
+        <div class="iva-item-description-abc">Нужен сайт срочно, пишите @someuser1</div>
+        <div class="geo-address-xyz">Москва</div>
+        <div data-marker="item-line">Иван Петров</div>
+      </div>
+      <div data-marker="item">
+        <a data-marker="item-title" href="/moskva/uslugi/2">Создание сайтов под ключ</a>
+      </div>
+    </body></html>
+    """
+
+    @pytest.mark.asyncio
+    async def test_parse_search_results(self, monkeypatch):
+        """Test extracting "looking for" listings from a search page."""
+        parser = AvitoParser()
+
+        async def fake_fetch_page_bytes(url):
+            return self.SEARCH_HTML.encode()
+
+        monkeypatch.setattr(parser, "fetch_page_bytes", fake_fetch_page_bytes)
+
+        results = await parser.parse_search_results("создание сайта")
+
+        assert results == [{
+            "text": "Ищу исполнителя: нужен сайт Нужен сайт срочно, пишите @someuser1",
+            "text_lower": "ищу исполнителя: нужен сайт нужен сайт срочно, пишите @someuser1",
+            "title": "Ищу исполнителя: нужен сайт",
+            "url": "https://www.avito.ru/moskva/uslugi/1",
+            "price": "50000",
+            "description": "Нужен сайт срочно, пишите @someuser1",
+            "location": "Москва",
+            "seller": "Иван Петров",
+            "query": "создание сайта",
+        }]
+
+        # The same listing on another results page is skipped
+        assert await parser.parse_search_results("разработка сайта", page=2) == []
+
+    @pytest.mark.asyncio
+    async def test_search_keeps_page_order(self, monkeypatch):
+        """Test that concurrently fetched pages are yielded in query/page order."""
+        parser = AvitoParser(queries=["a", "b"])
+
+        async def fake_parse_search_results(query, page=1):
+            await asyncio.sleep(0.01 if page == 1 else 0)
+            text = f"{query}{page}"
+            return [{"text": text, "text_lower": text, "title": text, "url": f"/{query}/{page}", "description": ""}]
+
+        monkeypatch.setattr(parser, "parse_search_results", fake_parse_search_results)
+
+        leads = [lead async for lead in parser.search(max_results=3)]
+
+        assert [lead.original_request for lead in leads] == ["a1", "a2", "b1"]
+
+
+class TestForumParser:
+    """Tests for ForumParser."""
+
+    FORUM_HTML = """
+    <html><body>
+      <li class="ipsDataItem">
+        <a class="ipsDataItem_title" href="/topic/1">Подскажите, кто сделает сайт?</a>
+        <div class="ipsDataItem_meta">Нужен интернет-магазин</div>
+      </li>
+      <li class="ipsDataItem">
+        <a class="ipsDataItem_title" href="/topic/2">Делаю сайты недорого</a>
+      </li>
+      <li class="ipsDataItem">
+        <a class="ipsDataItem_title" href="/topic/3">Ищу репетитора</a>
+      </li>
+    </body></html>
+    """
+
+    @pytest.mark.asyncio
+    async def test_parse_forum_keeps_requests(self, monkeypatch):
+        """Test that only request threads mentioning a keyword are kept."""
+        parser = ForumParser()
+
+        async def fake_fetch_page_bytes(url):
+            return self.FORUM_HTML.encode()
+
+        monkeypatch.setattr(parser, "fetch_page_bytes", fake_fetch_page_bytes)
+
+        results = await parser.parse_forum("maultalk")
+
+        assert [thread["url"] for thread in results] == ["https://maultalk.com/topic/1"]
+
+    @pytest.mark.asyncio
+    async def test_parse_thread(self, monkeypatch):
+        """Test reading the first post and its author from a thread page."""
+        parser = ForumParser()
+
+        async def fake_fetch_page_bytes(url):
+            return (
+                '<div class="ipsComment"><a class="ipsDataItem_author">ivan</a>'
+                '<div class="cPost_contentWrap">Нужен сайт, бюджет 50 тыс</div></div>'
+            ).encode()
+
+        monkeypatch.setattr(parser, "fetch_page_bytes", fake_fetch_page_bytes)
+
+        assert await parser.parse_thread("https://maultalk.com/topic/1") == {
+            "content": "Нужен сайт, бюджет 50 тыс",
+            "author": "ivan",
+        }
+
+
+class TestFreelanceParser:
+    """Tests for FreelanceParser."""
+
+    PLATFORM_HTML = """
+    <html><body>
+      <article class="task">
+        <a class="task__title" href="/tasks/1">Разработка сайта для студии</a>
+        <div class="task__description">Нужен лендинг, пишите test@example.com</div>
+        <span class="task__price">30 000 руб.</span>
+      </article>
+      <article class="task">
+        <a class="task__title" href="/tasks/2">Перевод текста</a>
+      </article>
+    </body></html>
+    """
+
+    @pytest.mark.asyncio
+    async def test_parse_platform(self, monkeypatch):
+        """Test extracting relevant projects from a listing page."""
+        parser = FreelanceParser()
+
+        async def fake_fetch_page_bytes(url):
+            return self.PLATFORM_HTML.encode()
+
+        monkeypatch.setattr(parser, "fetch_page_bytes", fake_fetch_page_bytes)
+
+        results = await parser.parse_platform("habr_freelance")
+
+        assert results == [{
+            "text": "Разработка сайта для студии Нужен лендинг, пишите test@example.com",
+            "text_lower": "разработка сайта для студии нужен лендинг, пишите test@example.com",
+            "title": "Разработка сайта для студии",
+            "url": "https://freelance.habr.com/tasks/1",
+            "description": "Нужен лендинг, пишите test@example.com",
+            "price": "30 000 руб.",
+            "platform": "habr_freelance",
+        }]
+
+
+class TestTelegramParser:
+    """Tests for TelegramParser."""
+
+    CHANNEL_HTML = """
+    <html><body>
+      <div class="tgme_widget_message_wrap">
+        <a class="tgme_widget_message_owner_name" href="/web_freelance">Web Freelance</a>
+        <div class="tgme_widget_message_text">Ищу разработчика сайта, пишите @client</div>
+        <a class="tgme_widget_message_date" href="https://t.me/web_freelance/10">
+          <time datetime="2024-01-15T10:30:00Z">10:30</time>
+        </a>
+      </div>
+      <div class="tgme_widget_message_wrap">
+        <div class="tgme_widget_message_text">Продам велосипед</div>
+      </div>
+    </body></html>
+    """
+
+    @pytest.mark.asyncio
+    async def test_parse_channel_page(self, monkeypatch):
+        """Test extracting relevant messages from a channel preview."""
+        parser = TelegramParser()
+
+        async def fake_fetch_page_bytes(url):
+            return self.CHANNEL_HTML.encode()
+
+        monkeypatch.setattr(parser, "fetch_page_bytes", fake_fetch_page_bytes)
+
+        messages = await parser.parse_channel_page("web_freelance")
+
+        assert len(messages) == 1
+        assert messages[0]["text"] == "Ищу разработчика сайта, пишите @client"
+        assert messages[0]["url"] == "https://t.me/web_freelance/10"
+        assert messages[0]["author"] == "Web Freelance"
+        assert messages[0]["date"].isoformat() == "2024-01-15T10:30:00+00:00"
+
+    def test_create_lead_extracts_name(self):
+        """Test picking the sender's name out of the message text."""
+        parser = TelegramParser()
+        message = {
+            "text": "Меня зовут Олег, нужен сайт",
+            "url": "https://t.me/c/1",
+            "channel": "c",
+            "channel_telegram": "@c",
+        }
+
+        lead = parser.create_lead_from_message(message)
+        assert lead.name == "Олег"
+        assert lead.telegram == "@c"
+
 
 class TestParsedLead:
     """Tests for ParsedLead dataclass."""
@@ -122,3 +419,44 @@ class TestParsedLead:
         assert lead.email == "test@example.com"
         assert lead.telegram == "@testuser"
         assert lead.found_at is not None
+
+    @pytest.mark.asyncio
+    async def test_search_drops_slow_pages(self, monkeypatch):
+        """Test that a hanging page is dropped without stalling the others."""
+        parser = AvitoParser(queries=["a"])
+        monkeypatch.setattr(parser, "PAGE_TIMEOUT", 0.05)
+
+        async def fake_parse_search_results(query, page=1):
+            if page == 1:
+                await asyncio.sleep(10)
+            text = f"{query}{page}"
+            return [{"text": text, "text_lower": text, "title": text, "url": f"/{query}/{page}", "description": ""}]
+
+        monkeypatch.setattr(parser, "parse_search_results", fake_parse_search_results)
+
+        leads = [lead async for lead in parser.search()]
+
+        assert [lead.original_request for lead in leads] == ["a2"]
+
+    @pytest.mark.asyncio
+    async def test_search_cancels_pending_pages(self, monkeypatch):
+        """Test that reaching max_results cancels pages still being fetched."""
+        parser = AvitoParser(queries=["a"])
+        cancelled = []
+
+        async def fake_parse_search_results(query, page=1):
+            if page == 2:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(page)
+                    raise
+            text = f"{query}{page}"
+            return [{"text": text, "text_lower": text, "title": text, "url": f"/{query}/{page}", "description": ""}]
+
+        monkeypatch.setattr(parser, "parse_search_results", fake_parse_search_results)
+
+        leads = [lead async for lead in parser.search(max_results=1)]
+
+        assert [lead.original_request for lead in leads] == ["a1"]
+        assert cancelled == [2]
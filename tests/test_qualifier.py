@@ -1,10 +1,17 @@
 """Tests for lead qualification service."""
 
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
 import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Lead, LeadStatus
+from app.config import settings
+from app.models import Lead, LeadStatus, WebsiteAnalysis
+from app.cache import ResponseCache
+from app.services import ai_client
 from app.services.lead_qualifier import LeadQualifierService
 
 
@@ -64,6 +71,9 @@ class TestLeadQualifierService:
         assert level == "normal"
         assert score < 50
 
+        # Phrases match whole words only: "this weekend" is not "this week"
+        assert qualifier.estimate_urgency_level("launch this weekend") == ("normal", 40.0)
+
     def test_check_disqualification(self, db_session: AsyncSession):
         """Test disqualification checks."""
         qualifier = LeadQualifierService(db_session)
@@ -105,6 +115,113 @@ class TestLeadQualifierService:
         )
         assert score < 60
 
+    def test_uses_shared_openai_client(self, db_session: AsyncSession, monkeypatch):
+        """Test that services share one OpenAI client when a key is configured."""
+        assert LeadQualifierService(db_session).openai_client is None
+
+        client = object()
+        monkeypatch.setattr(settings, "openai_api_key", "test-key")
+        monkeypatch.setattr(ai_client, "_openai_client", client)
+
+        assert LeadQualifierService(db_session).openai_client is client
+
+    def test_parse_json_reply(self):
+        """Test parsing bare and code-fenced JSON replies."""
+        assert ai_client.parse_json_reply('{"fit_score": 80}') == {"fit_score": 80}
+        assert ai_client.parse_json_reply('```json\n{"fit_score": 80}\n```') == {"fit_score": 80}
+        assert ai_client.parse_json_reply('Ответ:\n```\n{"is_spam": false}\n```') == {"is_spam": False}
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_paces_calls(self, monkeypatch):
+        """Test that calls beyond the burst wait for the bucket to refill."""
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            limiter._updated -= delay
+
+        monkeypatch.setattr(ai_client.asyncio, "sleep", fake_sleep)
+        limiter = ai_client.RateLimiter(2, period=60)
+
+        await limiter.acquire()
+        await limiter.acquire()
+        assert sleeps == []
+
+        await limiter.acquire()
+        assert len(sleeps) == 1
+        assert sleeps[0] == pytest.approx(30, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_cached_completion_reuses_identical_prompts(self, monkeypatch):
+        """Test that identical prompts, concurrent or repeated, make one API call."""
+        monkeypatch.setattr(ai_client, "_completions", OrderedDict())
+        calls = []
+
+        async def create(**params):
+            calls.append(params)
+            await asyncio.sleep(0)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        messages = [{"role": "user", "content": "prompt"}]
+
+        results = await asyncio.gather(*(
+            ai_client.cached_completion(client, model="m", messages=messages) for _ in range(3)
+        ))
+        results.append(await ai_client.cached_completion(client, model="m", messages=messages))
+        await ai_client.cached_completion(client, model="m", messages=[{"role": "user", "content": "other"}])
+
+        assert results == ["{}"] * 4
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_completion_survives_first_caller_cancel(self, monkeypatch):
+        """Test that cancelling the caller that started a request spares the others."""
+        monkeypatch.setattr(ai_client, "_completions", OrderedDict())
+        release = asyncio.Event()
+        calls = []
+
+        async def create(**params):
+            calls.append(params)
+            await release.wait()
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        first = asyncio.create_task(ai_client.cached_completion(client, model="m", messages=[]))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(ai_client.cached_completion(client, model="m", messages=[]))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        release.set()
+        assert await second == "{}"
+        assert first.cancelled()
+
+        # The answer was cached although its first caller went away
+        assert await ai_client.cached_completion(client, model="m", messages=[]) == "{}"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_completion_survives_restart(self, monkeypatch):
+        """Test that answers stored in the shared cache outlive the in-process LRU."""
+        monkeypatch.setattr(settings, "redis_url", "redis://cache")
+        monkeypatch.setattr(ai_client, "response_cache", ResponseCache())
+        calls = []
+
+        async def create(**params):
+            calls.append(params)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        for _ in range(2):
+            # A fresh process starts with an empty in-memory cache
+            monkeypatch.setattr(ai_client, "_completions", OrderedDict())
+            assert await ai_client.cached_completion(client, model="m", messages=[]) == "{}"
+
+        assert len(calls) == 1
+
     @pytest_asyncio.fixture
     async def qualifier_with_lead(self, db_session: AsyncSession, sample_lead: Lead):
         """Create qualifier with a sample lead."""
@@ -123,6 +240,28 @@ class TestLeadQualifierService:
         assert qualified_lead.fit_score is not None
         assert qualified_lead.status in [LeadStatus.NEW, LeadStatus.QUALIFIED]
 
+    @pytest.mark.asyncio
+    async def test_qualify_lead_uses_website_analysis(self, db_session: AsyncSession, sample_lead: Lead):
+        """Test that the eager-loaded website analysis feeds the score notes."""
+        sample_lead.website_analysis = WebsiteAnalysis(url=sample_lead.website, overall_score=42)
+        await db_session.commit()
+        qualifier = LeadQualifierService(db_session)
+
+        qualified_lead = await qualifier.qualify_lead(sample_lead.id)
+
+        assert "Качество сайта: 42" in qualified_lead.qualification_notes
+
+    def test_check_disqualification_nbsp(self, db_session: AsyncSession):
+        """Test that disqualifiers separated by non-breaking spaces still match."""
+        qualifier = LeadQualifierService(db_session)
+
+        assert qualifier.check_disqualification("Нужно тестовое\xa0задание")[0] is True
+        assert qualifier.check_disqualification("Test\xa0task for a landing")[0] is True
+
+        lead = Lead(name="NBSP", original_request="Сайт, no\u00a0payment")
+        assert qualifier.apply_disqualification(lead, qualifier.lead_text(lead)) is True
+        assert lead.status == LeadStatus.DISQUALIFIED
+
     @pytest.mark.asyncio
     async def test_qualify_lead_disqualification(self, db_session: AsyncSession, sample_source):
         """Test lead disqualification."""
@@ -152,3 +291,71 @@ class TestLeadQualifierService:
 
         assert len(hot_leads) > 0
         assert all(lead.qualification_score >= 60 for lead in hot_leads)
+
+    @pytest.mark.asyncio
+    async def test_qualify_all_new_leads_with_ai(
+        self, db_session: AsyncSession, sample_lead: Lead, monkeypatch
+    ):
+        """Test bulk AI qualification applies each verdict."""
+        monkeypatch.setattr(settings, "openai_api_key", "test-key")
+        qualifier = LeadQualifierService(db_session, openai_client=object())
+
+        async def fake_request(lead: Lead) -> dict:
+            return {"industry": "e-commerce", "budget_score": 80, "urgency_score": 70, "fit_score": 90}
+
+        monkeypatch.setattr(qualifier, "request_ai_qualification", fake_request)
+
+        results = await qualifier.qualify_all_new_leads(use_ai=True)
+
+        await db_session.refresh(sample_lead)
+        assert results["qualified"] == 1
+        assert sample_lead.status == LeadStatus.QUALIFIED
+        assert sample_lead.ai_analysis["fit_score"] == 90
+
+    @pytest.mark.asyncio
+    async def test_qualify_all_new_leads(
+        self, db_session: AsyncSession, sample_lead: Lead, monkeypatch
+    ):
+        """Test rule-based bulk qualification scores leads without reloading them."""
+        qualifier = LeadQualifierService(db_session)
+
+        async def no_reload(lead_id):
+            raise AssertionError("leads are scored in memory")
+
+        monkeypatch.setattr(qualifier, "qualify_lead", no_reload)
+
+        results = await qualifier.qualify_all_new_leads()
+
+        await db_session.refresh(sample_lead)
+        assert results == {"qualified": 1, "disqualified": 0, "spam": 0, "errors": []}
+        assert sample_lead.status == LeadStatus.QUALIFIED
+        assert sample_lead.qualification_score is not None
+
+    @pytest.mark.asyncio
+    async def test_qualify_all_new_leads_skips_ai_for_disqualified(
+        self, db_session: AsyncSession, sample_source, monkeypatch
+    ):
+        """Test that leads ruled out by patterns are not sent to the AI."""
+        lead = Lead(
+            name="Spam",
+            original_request="Сделайте сайт бесплатно",
+            source_id=sample_source.id,
+            status=LeadStatus.NEW,
+        )
+        db_session.add(lead)
+        await db_session.commit()
+
+        qualifier = LeadQualifierService(db_session, openai_client=object())
+        requested = []
+
+        async def fake_request(lead: Lead) -> dict:
+            requested.append(lead.id)
+            return {}
+
+        monkeypatch.setattr(qualifier, "request_ai_qualification", fake_request)
+
+        results = await qualifier.qualify_all_new_leads(use_ai=True)
+
+        assert results["disqualified"] == 1
+        assert requested == []
+        assert lead.status == LeadStatus.DISQUALIFIED
@@ -0,0 +1,82 @@
+"""Tests for website analysis service."""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import main
+from app.models import Lead, Source, WebsiteAnalysis
+from app.services import website_analyzer
+from app.services.website_analyzer import WebsiteAnalyzerService
+
+
+class TestWebsiteAnalyzerService:
+    """Tests for WebsiteAnalyzerService."""
+
+    @pytest.mark.asyncio
+    async def test_analyze_all_leads_websites(self, db_session: AsyncSession, sample_source: Source):
+        """Test that failures are counted per lead and the other analyses are saved."""
+        leads = {
+            name: Lead(name=name, website=website, source_id=sample_source.id)
+            for name, website in [
+                ("ok", "https://ok.example"),
+                ("broken", "https://broken.example"),
+                ("offline", "https://offline.example"),
+                ("no site", None),
+                ("done", "https://done.example"),
+            ]
+        }
+        db_session.add_all(leads.values())
+        await db_session.flush()
+        db_session.add(WebsiteAnalysis(lead_id=leads["done"].id, url="https://done.example"))
+        await db_session.commit()
+
+        analyzed_urls = []
+
+        async def analyze_website(url):
+            analyzed_urls.append(url)
+            if url == "https://broken.example":
+                raise RuntimeError("parser crashed")
+            if url == "https://offline.example":
+                return {"url": url, "is_accessible": False, "error": "timeout"}
+            return {"url": url, "is_accessible": True, "status_code": 200, "overall_score": 70.0}
+
+        analyzer = WebsiteAnalyzerService(db_session)
+        analyzer.analyze_website = analyze_website
+
+        results = await analyzer.analyze_all_leads_websites()
+
+        assert sorted(analyzed_urls) == [
+            "https://broken.example", "https://offline.example", "https://ok.example",
+        ]
+        assert results["analyzed"] == 2
+        assert results["failed"] == 1
+        assert results["errors"] == [f"Lead {leads['broken'].id}: parser crashed"]
+
+        rows = (await db_session.execute(select(WebsiteAnalysis))).scalars().all()
+        by_lead = {row.lead_id: row for row in rows}
+        assert set(by_lead) == {leads["ok"].id, leads["offline"].id, leads["done"].id}
+        assert by_lead[leads["ok"].id].is_accessible is True
+        assert by_lead[leads["ok"].id].overall_score == 70.0
+        assert by_lead[leads["offline"].id].is_accessible is False
+
+    @pytest.mark.asyncio
+    async def test_http_session_is_shared_and_closed_at_shutdown(self, monkeypatch):
+        """Test that analyzers share one session and app shutdown closes it."""
+        async def noop():
+            pass
+
+        monkeypatch.setattr(main, "init_db", noop)
+        monkeypatch.setattr(main, "close_db", noop)
+        monkeypatch.setattr(website_analyzer, "_http_session", None)
+
+        async with main.lifespan(main.app):
+            session = website_analyzer.get_http_session()
+            assert website_analyzer.get_http_session() is session
+            assert not session.closed
+
+        assert session.closed
+        # A closed session is replaced on next use
+        replacement = website_analyzer.get_http_session()
+        assert replacement is not session
+        await website_analyzer.close_http_session()